@@ -57,7 +57,7 @@ const Documents = () => {
         },
       });
       alert(`Uploaded ${document} successfully.`);
-      setUploadedDocs([...uploadedDocs, { id: response.data.id, document_name: document, file_path: response.data.file_path }]); // Include file path in uploadedDocs
+      setUploadedDocs([...uploadedDocs, { ...response.data, document_name: document }]); // Includes the url used to view it
       setFiles({ ...files, [document]: null });
     } catch (error) {
       console.error("Error uploading file:", error.response);
@@ -190,7 +190,7 @@ const Documents = () => {
                     {isUploaded && (
                       <button
                         className="btn btn-view"
-                        onClick={() => window.open(`http://localhost:5000/uploads_new/${uploadedDoc.file_name}`, '_blank')}
+                        onClick={() => window.open(`http://localhost:5000${uploadedDoc.url}`, '_blank')}
                       >
                         <FaEye /> View
                       </button>
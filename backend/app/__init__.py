@@ -2,6 +2,10 @@ from flask import Flask
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from .models import db  # Import db
+from .db_pool import mysql_pool
+from .model_registry import model_registry
+from .notification_outbox import notification_outbox
+from .query_budget import query_counter
 
 
 
@@ -15,6 +19,22 @@ def create_app():
 
     db.init_app(app)  # Initialize database
 
+    # Per-request SQLAlchemy query counts, checked against each view's @query_budget
+    app.config["QUERY_BUDGET_STRICT"] = False
+    query_counter.init_app(app)
+
+    # Shared pooled connections for the raw mysql.connector blueprints
+    app.config["MYSQL_POOL_SIZE"] = 5
+    app.config["MYSQL_POOL_MAX_OVERFLOW"] = 10
+    mysql_pool.init_app(app)
+
+    # Resumable document uploads (/api/uploads)
+    app.config["UPLOAD_MAX_FILE_SIZE"] = 2 * 1024 ** 3
+    app.config["UPLOAD_MAX_CHUNK_SIZE"] = 16 * 1024 ** 2
+    # Set to "x-sendfile" or "x-accel-redirect" when a web server can send document files for us
+    app.config["DOCUMENT_SENDFILE_MODE"] = None
+    app.config["DOCUMENT_ACCEL_PREFIX"] = "/protected_uploads/"
+
     # Register Blueprints
     from .routes.document_routes import document_bp
     from .routes.cost_estimation_routes import cost_estimation_bp
@@ -28,4 +48,12 @@ def create_app():
     app.register_blueprint(chatbot_bp)
     app.register_blueprint(meeting_bp)  
 
+    # Heavy models load in a background thread; /ready reports when they are done
+    model_registry.init_app(app)
+
+    # Background delivery of queued meeting notifications; workers start with the first request
+    app.config["NOTIFICATION_SINK"] = "log"
+    app.config["NOTIFICATION_WORKERS"] = 2
+    notification_outbox.init_app(app)
+
     return app
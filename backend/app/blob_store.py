@@ -0,0 +1,70 @@
+import hashlib
+import logging
+import os
+import uuid
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class BlobStore:
+    """Content-addressed files under ``<root>/<h[0:2]>/<h[2:4]>/<sha256>``.
+
+    Identical content is stored once; callers keep the references (the
+    ``documents.content_hash`` column) and decide when a blob is unused.
+    New content is written to ``<root>/.tmp`` first and renamed into place,
+    so a blob path either holds the complete file or does not exist.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.tmp_dir = os.path.join(root, '.tmp')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path(self, content_hash):
+        return os.path.join(self.root, content_hash[:2], content_hash[2:4], content_hash)
+
+    def owns(self, file_path):
+        return os.path.dirname(os.path.dirname(os.path.dirname(file_path))) == self.root
+
+    def temp_path(self):
+        return os.path.join(self.tmp_dir, uuid.uuid4().hex)
+
+    def write_temp(self, stream):
+        """Copy ``stream`` to a temp file, hashing as it goes. Returns ``(temp_path, sha256, size)``."""
+        temp_path = self.temp_path()
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(temp_path, 'wb') as f:
+                for block in iter(lambda: stream.read(READ_BLOCK_SIZE), b''):
+                    digest.update(block)
+                    f.write(block)
+                    size += len(block)
+        except BaseException:
+            self.discard_temp(temp_path)
+            raise
+        return temp_path, digest.hexdigest(), size
+
+    def ingest(self, temp_path, content_hash):
+        """Move a temp file into the store; dropped instead if the blob already exists."""
+        blob_path = self.path(content_hash)
+        if os.path.exists(blob_path):
+            self.discard_temp(temp_path)
+            return blob_path
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.replace(temp_path, blob_path)
+        return blob_path
+
+    def discard_temp(self, temp_path):
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+
+    def remove(self, content_hash):
+        blob_path = self.path(content_hash)
+        try:
+            os.remove(blob_path)
+            logging.debug(f"Blob deleted: {blob_path}")
+        except FileNotFoundError:
+            logging.warning(f"Blob does not exist: {blob_path}")
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # Windows: chunk writes are only serialised within one process
+    fcntl = None
+
+DEFAULT_MAX_FILE_SIZE = 2 * 1024 ** 3
+DEFAULT_MAX_CHUNK_SIZE = 16 * 1024 ** 2
+DEFAULT_SESSION_TTL = 24 * 3600
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """A chunked upload request that cannot be applied; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400, **details):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.details = details
+
+
+class UploadSessionStore:
+    """Resumable uploads written chunk by chunk to ``<directory>/<upload_id>.part``.
+
+    The partial file is the source of truth for how many bytes were received,
+    so an upload survives worker restarts and can be resumed from any worker
+    sharing the folder. Writing a chunk or completing holds an exclusive
+    ``flock`` on the partial file, so two workers never write to the same
+    upload at once (the folder must support flock; without ``fcntl`` the
+    lock only covers this process). The SHA-256 is updated as chunks
+    arrive; if this process has not seen every chunk (restart, another
+    worker) the partial file is re-hashed once before continuing. Limits
+    come from the app config:
+    ``UPLOAD_MAX_FILE_SIZE``, ``UPLOAD_MAX_CHUNK_SIZE`` and ``UPLOAD_SESSION_TTL``.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._session_locks = {}
+        self._hashers = {}  # upload_id -> (sha256, bytes hashed)
+
+    def _config(self, key, default):
+        return current_app.config.get(key, default)
+
+    def _paths(self, upload_id):
+        # Ids are uuid4 hex; anything else cannot name a session
+        if len(upload_id) != 32 or not all(c in '0123456789abcdef' for c in upload_id):
+            raise UploadError("Upload not found", 404)
+        base = os.path.join(self.directory, upload_id)
+        return base + '.json', base + '.part'
+
+    @contextmanager
+    def _locked(self, upload_id, busy_message):
+        """Exclusive use of an upload's partial file; yields a descriptor open for appending."""
+        _, part_path = self._paths(upload_id)
+        try:
+            # No O_CREAT: a session discarded meanwhile must not be recreated empty
+            fd = os.open(part_path, os.O_WRONLY | os.O_APPEND)
+        except FileNotFoundError:
+            raise UploadError("Upload not found", 404)
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise UploadError(busy_message, 409)
+                yield fd
+            else:
+                with self._lock:
+                    lock = self._session_locks.setdefault(upload_id, threading.Lock())
+                if not lock.acquire(blocking=False):
+                    raise UploadError(busy_message, 409)
+                try:
+                    yield fd
+                finally:
+                    lock.release()
+        finally:
+            # Closing the descriptor releases the flock
+            os.close(fd)
+
+    def _write_session(self, upload_id, session):
+        session_path, _ = self._paths(upload_id)
+        tmp_path = session_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session, f)
+        os.replace(tmp_path, session_path)
+
+    def create(self, total_size, **info):
+        max_size = self._config('UPLOAD_MAX_FILE_SIZE', DEFAULT_MAX_FILE_SIZE)
+        if total_size <= 0:
+            raise UploadError("total_size must be positive")
+        if total_size > max_size:
+            raise UploadError(f"File exceeds the maximum size of {max_size} bytes", 413)
+
+        self.purge_expired()
+        upload_id = uuid.uuid4().hex
+        _, part_path = self._paths(upload_id)
+        open(part_path, 'wb').close()
+        self._write_session(upload_id, dict(info, total_size=total_size, created_at=time.time()))
+        self._hashers[upload_id] = (hashlib.sha256(), 0)
+        return upload_id
+
+    def get(self, upload_id):
+        """The session info plus ``received``, the offset the next chunk must start at."""
+        session_path, part_path = self._paths(upload_id)
+        try:
+            with open(session_path, 'r', encoding='utf-8') as f:
+                session = json.load(f)
+        except FileNotFoundError:
+            raise UploadError("Upload not found", 404)
+        session['upload_id'] = upload_id
+        session['received'] = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        return session
+
+    def _hasher(self, upload_id, part_path, received):
+        sha256, hashed = self._hashers.get(upload_id, (None, -1))
+        if hashed != received:
+            sha256 = hashlib.sha256()
+            with open(part_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    sha256.update(block)
+        return sha256
+
+    def append(self, upload_id, offset, stream):
+        """Append the bytes of ``stream`` at ``offset``; returns the updated session.
+
+        The body is copied in small blocks, so a chunk never sits in memory
+        whole. A chunk that does not start at the current end of the partial
+        file is rejected with 409 and the offset to resume from.
+        """
+        max_chunk = self._config('UPLOAD_MAX_CHUNK_SIZE', DEFAULT_MAX_CHUNK_SIZE)
+        with self._locked(upload_id, "Another chunk for this upload is in progress") as fd:
+            session = self.get(upload_id)
+            received = session['received']
+            if offset != received:
+                raise UploadError("Offset does not match the received size", 409, received=received)
+
+            _, part_path = self._paths(upload_id)
+            sha256 = self._hasher(upload_id, part_path, received)
+            # Invalidated until the chunk is fully written, so a failed chunk forces a re-hash
+            self._hashers.pop(upload_id, None)
+            written = 0
+            with os.fdopen(fd, 'ab', closefd=False) as f:
+                while True:
+                    block = stream.read(READ_BLOCK_SIZE)
+                    if not block:
+                        break
+                    written += len(block)
+                    if written > max_chunk:
+                        f.truncate(received)
+                        raise UploadError(f"Chunk exceeds the maximum size of {max_chunk} bytes", 413)
+                    if received + written > session['total_size']:
+                        f.truncate(received)
+                        raise UploadError("Chunk goes past the declared total_size", 413)
+                    f.write(block)
+                    sha256.update(block)
+            self._hashers[upload_id] = (sha256, received + written)
+            session['received'] = received + written
+            return session
+
+    def complete(self, upload_id, destination, expected_sha256=None):
+        """Finish the upload: check its size, publish it at ``destination`` and return its SHA-256.
+
+        The partial file is hard-linked into place, which is atomic and fails
+        instead of overwriting if ``destination`` already exists. A mismatch
+        with ``expected_sha256`` discards the upload, its bytes cannot be fixed
+        by resending chunks.
+        """
+        with self._locked(upload_id, "A chunk for this upload is still in progress"):
+            session = self.get(upload_id)
+            if session['received'] != session['total_size']:
+                raise UploadError("Upload is incomplete", 409, received=session['received'])
+            _, part_path = self._paths(upload_id)
+            content_hash = self._hasher(upload_id, part_path, session['received']).hexdigest()
+            if expected_sha256 and expected_sha256.lower() != content_hash:
+                self._discard(upload_id)
+                raise UploadError("Checksum mismatch", 422, sha256=content_hash)
+            try:
+                os.link(part_path, destination)
+            except FileExistsError:
+                raise UploadError("File already exists", 409)
+            self._discard(upload_id)
+            return content_hash
+
+    def abort(self, upload_id):
+        self.get(upload_id)
+        self._discard(upload_id)
+
+    def _discard(self, upload_id):
+        for path in self._paths(upload_id):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._hashers.pop(upload_id, None)
+        with self._lock:
+            self._session_locks.pop(upload_id, None)
+
+    def purge_expired(self):
+        """Drop sessions that have not been touched within ``UPLOAD_SESSION_TTL`` seconds."""
+        cutoff = time.time() - self._config('UPLOAD_SESSION_TTL', DEFAULT_SESSION_TTL)
+        for name in os.listdir(self.directory):
+            upload_id, ext = os.path.splitext(name)
+            if ext != '.part':
+                continue
+            try:
+                if os.path.getmtime(os.path.join(self.directory, name)) < cutoff:
+                    logging.info(f"Removing expired upload {upload_id}")
+                    self._discard(upload_id)
+            except (OSError, UploadError):
+                continue
@@ -0,0 +1,201 @@
+import logging
+import queue
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error
+from flask import g, has_app_context, jsonify
+
+
+class PoolTimeoutError(Error):
+    """Raised when no connection could be checked out within the pool timeout."""
+
+
+class PooledConnection:
+    """Thin proxy around a MySQL connection that returns itself to the pool on close()."""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._raw, self._created_at)
+        if has_app_context() and g.get('_mysql_conn') is self:
+            g.pop('_mysql_conn', None)
+
+
+class MySQLPool:
+    """Application-level MySQL connection pool.
+
+    Keeps up to ``MYSQL_POOL_SIZE`` idle connections around and allows
+    ``MYSQL_POOL_MAX_OVERFLOW`` extra connections during spikes. Connections
+    are checked out once per request (stored on ``flask.g``) and returned to
+    the pool when the handler closes them or when the app context tears down.
+    """
+
+    def __init__(self, app=None):
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._available = None
+        self._opened = 0
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+            'checkout_time_total_ms': 0.0,
+            'checkout_time_max_ms': 0.0,
+        }
+        self._in_use = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MYSQL_HOST', 'localhost')
+        app.config.setdefault('MYSQL_USER', 'root')
+        app.config.setdefault('MYSQL_PASSWORD', '')
+        app.config.setdefault('MYSQL_DATABASE', 'construction_mgmt')
+        app.config.setdefault('MYSQL_POOL_SIZE', 5)
+        app.config.setdefault('MYSQL_POOL_MAX_OVERFLOW', 10)
+        app.config.setdefault('MYSQL_POOL_TIMEOUT', 10)
+        app.config.setdefault('MYSQL_POOL_RECYCLE', 3600)
+        app.config.setdefault('MYSQL_POOL_PRE_PING', True)
+
+        self._config = app.config
+        self._available = threading.BoundedSemaphore(
+            app.config['MYSQL_POOL_SIZE'] + app.config['MYSQL_POOL_MAX_OVERFLOW']
+        )
+        app.extensions['mysql_pool'] = self
+        app.teardown_appcontext(self._teardown)
+        app.add_url_rule('/db_pool/stats', 'db_pool_stats', lambda: jsonify(self.stats()))
+
+    def _connect(self):
+        conn = mysql.connector.connect(
+            host=self._config['MYSQL_HOST'],
+            user=self._config['MYSQL_USER'],
+            password=self._config['MYSQL_PASSWORD'],
+            database=self._config['MYSQL_DATABASE']
+        )
+        with self._lock:
+            self._opened += 1
+        return conn, time.monotonic()
+
+    def _discard(self, conn):
+        with self._lock:
+            self._opened -= 1
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    def _is_healthy(self, conn, created_at):
+        recycle = self._config['MYSQL_POOL_RECYCLE']
+        if recycle and time.monotonic() - created_at > recycle:
+            return False
+        if not self._config['MYSQL_POOL_PRE_PING']:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Error:
+            with self._lock:
+                self._stats['health_check_failures'] += 1
+            return False
+
+    def checkout(self):
+        started = time.perf_counter()
+        if not self._available.acquire(blocking=False):
+            with self._lock:
+                self._stats['waits'] += 1
+            if not self._available.acquire(timeout=self._config['MYSQL_POOL_TIMEOUT']):
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                raise PoolTimeoutError(msg="Timed out waiting for a MySQL connection from the pool")
+
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    candidate, created_at = self._idle.get_nowait()
+                except queue.Empty:
+                    conn, created_at = self._connect()
+                    break
+                if self._is_healthy(candidate, created_at):
+                    conn = candidate
+                else:
+                    self._discard(candidate)
+        except Exception:
+            self._available.release()
+            raise
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._in_use += 1
+            self._stats['checkouts'] += 1
+            self._stats['checkout_time_total_ms'] += elapsed_ms
+            self._stats['checkout_time_max_ms'] = max(self._stats['checkout_time_max_ms'], elapsed_ms)
+        return PooledConnection(self, conn, created_at)
+
+    def _release(self, conn, created_at):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            keep = self._idle.qsize() < self._config['MYSQL_POOL_SIZE']
+        except Error:
+            keep = False
+
+        if keep:
+            self._idle.put((conn, created_at))
+        else:
+            self._discard(conn)
+
+        with self._lock:
+            self._in_use -= 1
+        self._available.release()
+
+    def get_connection(self):
+        if '_mysql_conn' not in g:
+            g._mysql_conn = self.checkout()
+        return g._mysql_conn
+
+    def _teardown(self, exc):
+        conn = g.pop('_mysql_conn', None)
+        if conn is not None:
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            checkouts = self._stats['checkouts']
+            return {
+                'pool_size': self._config['MYSQL_POOL_SIZE'],
+                'max_overflow': self._config['MYSQL_POOL_MAX_OVERFLOW'],
+                'open_connections': self._opened,
+                'idle': self._idle.qsize(),
+                'in_use': self._in_use,
+                'checkouts': checkouts,
+                'waits': self._stats['waits'],
+                'timeouts': self._stats['timeouts'],
+                'health_check_failures': self._stats['health_check_failures'],
+                'avg_checkout_ms': round(self._stats['checkout_time_total_ms'] / checkouts, 3) if checkouts else 0.0,
+                'max_checkout_ms': round(self._stats['checkout_time_max_ms'], 3),
+            }
+
+
+mysql_pool = MySQLPool()
+
+
+def get_db_connection():
+    try:
+        return mysql_pool.get_connection()
+    except Error as e:
+        logging.error(f"Database connection error: {e}")
+        raise
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+
+import numpy as np
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _model_dir(cache_dir, model_name):
+    return os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+
+
+def _dataset_key(model_name, entry_hashes):
+    sha256 = hashlib.sha256(model_name.encode('utf-8'))
+    for entry_hash in entry_hashes:
+        sha256.update(entry_hash.encode('ascii'))
+    return sha256.hexdigest()[:32]
+
+
+def _atomic_write(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _latest_manifest(model_dir):
+    manifests = [
+        os.path.join(model_dir, name) for name in os.listdir(model_dir) if name.endswith('.json')
+    ]
+    for path in sorted(manifests, key=os.path.getmtime, reverse=True):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest, np.load(os.path.join(model_dir, manifest['embeddings']), mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            continue
+    return None, None
+
+
+def load_embeddings(texts, encode, model_name, cache_dir):
+    """Normalized embeddings for ``texts``, persisted as a memory-mapped ``.npy`` file.
+
+    The file is keyed by a hash of the model name and every text, so workers
+    share one copy through the page cache. When the texts change, rows for
+    entries that already had an embedding in the previous file are reused and
+    only new or edited entries go through ``encode``.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    model_dir = _model_dir(cache_dir, model_name)
+    os.makedirs(model_dir, exist_ok=True)
+
+    entry_hashes = [text_hash(text) for text in texts]
+    key = _dataset_key(model_name, entry_hashes)
+    embeddings_path = os.path.join(model_dir, f'{key}.npy')
+    manifest_path = os.path.join(model_dir, f'{key}.json')
+
+    if os.path.exists(embeddings_path) and os.path.exists(manifest_path):
+        embeddings = np.load(embeddings_path, mmap_mode='r')
+        if len(embeddings) == len(texts):
+            return embeddings
+
+    previous, previous_embeddings = _latest_manifest(model_dir)
+    previous_rows = {}
+    if previous is not None:
+        previous_rows = {entry_hash: row for row, entry_hash in enumerate(previous['entries'])}
+
+    missing = [i for i, entry_hash in enumerate(entry_hashes) if entry_hash not in previous_rows]
+    logging.info(f"Embedding cache for {model_name}: reusing {len(texts) - len(missing)} rows, encoding {len(missing)}")
+
+    new_embeddings = None
+    if missing:
+        new_embeddings = np.asarray(encode([texts[i] for i in missing]), dtype=np.float32)
+        norms = np.linalg.norm(new_embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        new_embeddings = new_embeddings / norms
+
+    dim = new_embeddings.shape[1] if new_embeddings is not None else previous_embeddings.shape[1]
+    embeddings = np.empty((len(texts), dim), dtype=np.float32)
+    reused = [i for i, entry_hash in enumerate(entry_hashes) if entry_hash in previous_rows]
+    if reused:
+        embeddings[reused] = previous_embeddings[[previous_rows[entry_hashes[i]] for i in reused]]
+    if missing:
+        embeddings[missing] = new_embeddings
+
+    _atomic_write(embeddings_path, lambda f: np.save(f, embeddings))
+    manifest = {'model': model_name, 'embeddings': os.path.basename(embeddings_path), 'entries': entry_hashes}
+    _atomic_write(manifest_path, lambda f: f.write(json.dumps(manifest).encode('utf-8')))
+
+    # Older generations are no longer needed; workers still mapping them keep their pages
+    for name in os.listdir(model_dir):
+        if not name.startswith(key) and (name.endswith('.npy') or name.endswith('.json')):
+            try:
+                os.remove(os.path.join(model_dir, name))
+            except OSError:
+                pass
+
+    return np.load(embeddings_path, mmap_mode='r')
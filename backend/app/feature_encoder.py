@@ -0,0 +1,156 @@
+import json
+
+import numpy as np
+
+
+NUMERIC_COLUMNS = ['Area', 'Floors', 'ApproxCost']
+CATEGORICAL_COLUMNS = ['Location', 'Quality', 'Type']
+
+# Request payload keys -> raw dataset columns
+INPUT_KEYS = {
+    'area': 'Area',
+    'floors': 'Floors',
+    'approx_cost': 'ApproxCost',
+    'location': 'Location',
+    'quality': 'Quality',
+    'construction_type': 'Type'
+}
+
+# Interaction terms: (feature name, left factor, right factor)
+INTERACTIONS = [
+    ('Floors_Location_Urban', 'Floors', 'Location_Urban'),
+    ('Floors_Quality_Premium', 'Floors', 'Quality_Premium'),
+    ('Floors_Quality_Standard', 'Floors', 'Quality_Standard'),
+    ('Floors_Type_Commercial', 'Floors', 'Type_Commercial'),
+    ('Floors_Type_Industrial', 'Floors', 'Type_Industrial'),
+    ('Area_Floors', 'Area', 'Floors'),
+    ('ApproxCost_Floors', 'ApproxCost', 'Floors'),
+    ('Location_ApproxCost', 'Location_Urban', 'ApproxCost'),
+    ('Location_Floors', 'Location_Urban', 'Floors'),
+    ('Quality_Location_Urban', 'Quality_Premium', 'Location_Urban')
+]
+
+# Emphasize higher urban cost and floors
+URBAN_FACTOR = 1.2
+LOCATION_FACTOR_FEATURE = 'Location'
+URBAN_INTERACTIONS = [('Floors_Urban', 'Floors', LOCATION_FACTOR_FEATURE)]
+
+# Levels seen in Updated_Construction_Cost_Prediction_Dataset.csv, used for models
+# trained before the encoder was saved next to them.
+DEFAULT_CATEGORIES = {
+    'Location': ['Rural', 'Urban'],
+    'Quality': ['Basic', 'Premium', 'Standard'],
+    'Type': ['Commercial', 'Industrial', 'Residential']
+}
+
+
+class CostFeatureEncoder:
+    """Maps raw cost inputs to the model's feature matrix.
+
+    Reproduces ``pd.get_dummies(drop_first=True)`` plus the interaction terms
+    used in ``train_model.py``, writing straight into a preallocated float64
+    array in ``feature_names`` order. The same object is used for training and
+    serving so the two can not drift apart.
+    """
+
+    def __init__(self, categories=None, feature_names=None):
+        self.categories = {key: list(levels) for key, levels in (categories or DEFAULT_CATEGORIES).items()}
+        self.feature_names = list(feature_names) if feature_names is not None else self._default_feature_names()
+        self._compile()
+
+    def _default_feature_names(self):
+        names = list(NUMERIC_COLUMNS)
+        for column in CATEGORICAL_COLUMNS:
+            names.extend(f'{column}_{level}' for level in self.categories[column][1:])
+        names.extend(name for name, _, _ in INTERACTIONS)
+        names.append(LOCATION_FACTOR_FEATURE)
+        names.extend(name for name, _, _ in URBAN_INTERACTIONS)
+        return names
+
+    def _compile(self):
+        index = {name: j for j, name in enumerate(self.feature_names)}
+        self._index = index
+
+        # Base columns first, then derived ones that read back from the output array
+        self._numeric_ops = [(index[name], name) for name in NUMERIC_COLUMNS if name in index]
+        self._onehot_ops = [
+            (index[f'{column}_{level}'], column, level)
+            for column in CATEGORICAL_COLUMNS
+            for level in self.categories[column]
+            if f'{column}_{level}' in index
+        ]
+
+        # Factors that are not model features behave like the zero column X.get(name, 0)
+        def product_ops(terms):
+            return [
+                (index[name], index[left], index[right])
+                for name, left, right in terms
+                if name in index and left in index and right in index
+            ]
+
+        self._product_ops = product_ops(INTERACTIONS)
+        self._urban_index = index.get('Location_Urban')
+        self._location_index = index.get(LOCATION_FACTOR_FEATURE)
+        self._urban_product_ops = product_ops(URBAN_INTERACTIONS)
+
+    @classmethod
+    def fit(cls, columns):
+        """Learn categorical levels from raw training columns (sorted, like get_dummies)."""
+        categories = {
+            column: sorted(str(level) for level in set(np.asarray(columns[column]).tolist()))
+            for column in CATEGORICAL_COLUMNS
+        }
+        return cls(categories=categories)
+
+    def transform_columns(self, columns, out=None):
+        """Encode raw dataset columns (``Area``, ``Location``, ...) into a feature matrix."""
+        n_rows = len(columns[NUMERIC_COLUMNS[0]])
+        if out is None:
+            out = np.zeros((n_rows, len(self.feature_names)), dtype=np.float64)
+        else:
+            out.fill(0.0)
+
+        for j, name in self._numeric_ops:
+            out[:, j] = np.asarray(columns[name], dtype=np.float64)
+        for j, column, level in self._onehot_ops:
+            out[:, j] = np.asarray(columns[column]) == level
+
+        for j, left, right in self._product_ops:
+            np.multiply(out[:, left], out[:, right], out=out[:, j])
+
+        if self._location_index is not None:
+            if self._urban_index is not None:
+                out[:, self._location_index] = np.where(out[:, self._urban_index] == 1, URBAN_FACTOR, 1.0)
+            else:
+                out[:, self._location_index] = 1.0
+        for j, left, right in self._urban_product_ops:
+            np.multiply(out[:, left], out[:, right], out=out[:, j])
+
+        return out
+
+    def transform(self, records, out=None):
+        """Encode request payloads (``area``, ``location``, ...) into a feature matrix."""
+        columns = {column: [record[key] for record in records] for key, column in INPUT_KEYS.items()}
+        return self.transform_columns(columns, out=out)
+
+    def location_factor(self, X):
+        """The urban cost factor column of an encoded matrix."""
+        if self._location_index is None:
+            return np.ones(len(X))
+        return X[:, self._location_index]
+
+    def to_dict(self):
+        return {'categories': self.categories, 'feature_names': self.feature_names}
+
+    @classmethod
+    def from_dict(cls, spec):
+        return cls(categories=spec['categories'], feature_names=spec['feature_names'])
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,132 @@
+import hashlib
+
+import numpy as np
+
+
+class CompiledForest:
+    """Flattened tree ensemble evaluated with NumPy array ops.
+
+    Every tree of a fitted sklearn ``RandomForestRegressor`` is laid out in
+    contiguous node arrays (feature, threshold, left, right, value) and a batch
+    is evaluated by walking all trees for all rows at once, one depth level per
+    step. Leaves point back to themselves so finished walks stay put.
+
+    Exposes ``predict`` and ``feature_names_in_`` so it can stand in for the
+    sklearn model in the serving code. It wins by a wide margin for the small
+    batches /predict sees; for batches of many hundreds of rows sklearn's C
+    tree walk catches up.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, feature_names, source_digest=''):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        # sha256 of the pickled sklearn model this forest was exported from
+        self.source_digest = source_digest
+        # children[2 * node + went_left] -> next node, so a step is a single gather
+        self._children = np.stack([right, left], axis=1).ravel()
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold).astype(np.float64))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            values.append(tree.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int64),
+            max_depth=max_depth,
+            feature_names=model.feature_names_in_
+        )
+
+    def save(self, path):
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            max_depth=np.asarray(self.max_depth),
+            feature_names=np.asarray(self.feature_names_in_, dtype=str),
+            source_digest=np.asarray(self.source_digest)
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls(
+                feature=arrays['feature'],
+                threshold=arrays['threshold'],
+                left=arrays['left'],
+                right=arrays['right'],
+                value=arrays['value'],
+                roots=arrays['roots'],
+                max_depth=arrays['max_depth'],
+                feature_names=arrays['feature_names'].tolist(),
+                source_digest=str(arrays['source_digest'])
+            )
+
+    def predict(self, X):
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+
+        nodes = np.repeat(self.roots[:, None], n_rows, axis=1)
+        row_offsets = (np.arange(n_rows) * n_features)[None, :]
+        for _ in range(self.max_depth):
+            went_left = flat[row_offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self._children[2 * nodes + went_left]
+
+        return self.value[nodes].mean(axis=0)
+
+
+def file_digest(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def export_forest(model, path, source_path=None):
+    """Flatten a fitted sklearn forest and save it as an ``.npz`` file.
+
+    ``source_path`` is the pickled model the forest came from; its digest is
+    stored so stale exports can be detected after retraining.
+    """
+    forest = CompiledForest.from_sklearn(model)
+    if source_path:
+        forest.source_digest = file_digest(source_path)
+    forest.save(path)
+    return forest
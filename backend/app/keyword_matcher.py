@@ -0,0 +1,85 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton that finds every keyword occurring in a text in one pass.
+
+    Built once from the FAQ keys; ``best_match`` resolves several hits
+    deterministically: the longest keyword wins, ties go to the keyword that
+    came first in the input order.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self._goto = [{}]
+        self._fail = [0]
+        self._terminal = [-1]   # keyword id ending exactly at this node
+        self._output = [-1]     # nearest node on the fail chain that is terminal
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terminal.append(-1)
+                    self._output.append(-1)
+                node = next_node
+            if self._terminal[node] == -1:
+                self._terminal[node] = keyword_id
+
+        # Breadth-first so every fail target is finished before it is used
+        queue = deque([0])
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                target = 0
+                if node:
+                    fail = self._fail[node]
+                    while fail and char not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    target = self._goto[fail].get(char, 0)
+                self._fail[child] = target
+                self._output[child] = target if self._terminal[target] != -1 else self._output[target]
+                queue.append(child)
+
+    def _scan(self, text):
+        """Yield the node reached after each character of ``text``."""
+        goto, fail = self._goto, self._fail
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            yield node
+
+    def find_all(self, text):
+        """All ``(start, keyword)`` occurrences in ``text``, ordered by end position."""
+        matches = []
+        for end, node in enumerate(self._scan(text), start=1):
+            if self._terminal[node] == -1:
+                node = self._output[node]
+            while node > 0:
+                keyword = self.keywords[self._terminal[node]]
+                matches.append((end - len(keyword), keyword))
+                node = self._output[node]
+        return matches
+
+    def best_match(self, text):
+        """The longest keyword occurring in ``text`` (earliest keyword on ties), or None."""
+        best_id = -1
+        best_length = 0
+        for node in self._scan(text):
+            # The longest keyword ending here is the node itself, else the nearest output link
+            if self._terminal[node] == -1:
+                node = self._output[node]
+            if node <= 0:
+                continue
+            keyword_id = self._terminal[node]
+            length = len(self.keywords[keyword_id])
+            if length > best_length or (length == best_length and keyword_id < best_id):
+                best_id, best_length = keyword_id, length
+        return self.keywords[best_id] if best_id != -1 else None
@@ -0,0 +1,46 @@
+import heapq
+from collections import defaultdict
+
+
+def find_overlaps(intervals):
+    """Every overlapping pair among ``(start, end, id)`` intervals, by a sweep over start times.
+
+    Intervals are half-open, so one ending exactly when another starts does
+    not overlap it. Sorting is O(n log n) and each interval enters and leaves
+    the active heap once; beyond that the cost is the number of overlapping
+    pairs reported. Yields ``(earlier_id, later_id, overlap_start, overlap_end)``.
+    """
+    active = []  # min-heap of (end, id) for intervals that started and have not ended
+    for start, end, interval_id in sorted(intervals, key=lambda interval: (interval[0], interval[2])):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for other_end, other_id in active:
+            yield other_id, interval_id, start, min(end, other_end)
+        heapq.heappush(active, (end, interval_id))
+
+
+def find_conflicts(meetings, keys):
+    """Overlapping meetings that share a value of any of ``keys``.
+
+    ``meetings`` are rows with ``id``, ``date_time``, ``end_time`` and the key
+    columns. Returns dicts naming the shared column and value, the two
+    meeting ids and the overlapping window.
+    """
+    conflicts = []
+    for key in keys:
+        groups = defaultdict(list)
+        for meeting in meetings:
+            groups[getattr(meeting, key)].append((meeting.date_time, meeting.end_time, meeting.id))
+        for value, intervals in groups.items():
+            if len(intervals) < 2:
+                continue
+            for first_id, second_id, overlap_start, overlap_end in find_overlaps(intervals):
+                conflicts.append({
+                    "conflict_on": key,
+                    "value": value,
+                    "meeting_ids": [first_id, second_id],
+                    "overlap_start": overlap_start.isoformat(),
+                    "overlap_end": overlap_end.isoformat()
+                })
+    conflicts.sort(key=lambda conflict: (conflict["overlap_start"], conflict["meeting_ids"]))
+    return conflicts
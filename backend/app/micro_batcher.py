@@ -0,0 +1,112 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+def _histogram_bucket(size):
+    if size <= 2:
+        return str(size)
+    upper = 1 << (size - 1).bit_length()
+    return f"{upper // 2 + 1}-{upper}"
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item calls into batched calls of ``fn``.
+
+    Requests submitted within ``max_wait_ms`` of the first waiting one are
+    handed to ``fn`` together (at most ``max_batch_size`` at a time) and each
+    caller gets its own row of the result back. ``fn`` takes a list of items
+    and returns a sequence of results in the same order.
+    """
+
+    def __init__(self, fn, max_batch_size=32, max_wait_ms=5, name='micro-batcher'):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'items': 0,
+            'batches': 0,
+            'max_queue_depth': 0,
+            'queue_wait_total_ms': 0.0,
+            'batch_time_total_ms': 0.0
+        }
+        # Batch sizes bucketed by powers of two: "1", "2", "3-4", "5-8", ...
+        self._histogram = {}
+
+    def _ensure_worker(self):
+        # Started on first use so forked workers each get their own thread
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._worker.start()
+
+    def submit(self, item):
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future, time.perf_counter()))
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._queue.qsize())
+        return future
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                results = self.fn([item for item, _, _ in batch])
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logging.exception(f"{self.name}: batch of {len(batch)} failed")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self._record(batch, started)
+
+    def _record(self, batch, started):
+        finished = time.perf_counter()
+        bucket = _histogram_bucket(len(batch))
+        with self._lock:
+            self._stats['items'] += len(batch)
+            self._stats['batches'] += 1
+            self._stats['batch_time_total_ms'] += (finished - started) * 1000
+            self._stats['queue_wait_total_ms'] += sum(started - enqueued for _, _, enqueued in batch) * 1000
+            self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            batches = self._stats['batches']
+            items = self._stats['items']
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self._stats['max_queue_depth'],
+                'requests': self._stats['requests'],
+                'batches': batches,
+                'avg_batch_size': round(items / batches, 2) if batches else 0.0,
+                'avg_queue_wait_ms': round(self._stats['queue_wait_total_ms'] / items, 3) if items else 0.0,
+                'avg_batch_time_ms': round(self._stats['batch_time_total_ms'] / batches, 3) if batches else 0.0,
+                'batch_size_histogram': dict(sorted(self._histogram.items(), key=lambda item: int(item[0].split('-')[0])))
+            }
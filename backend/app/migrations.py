@@ -0,0 +1,204 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from mysql.connector import Error
+
+
+def create_index(table, name, columns):
+    """Migration step creating an index unless it already exists (MySQL has no IF NOT EXISTS here)."""
+    def step(cursor):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (table, name))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+    return step
+
+
+def add_column(table, name, definition):
+    """Migration step adding a column unless it already exists."""
+    def step(cursor):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """, (table, name))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+    return step
+
+
+def cascade_foreign_key(table, column, parent, name):
+    """Migration step recreating the ``table.column -> parent`` foreign key with ON DELETE CASCADE."""
+    def step(cursor):
+        cursor.execute("""
+            SELECT rc.constraint_name, rc.delete_rule
+            FROM information_schema.referential_constraints rc
+            JOIN information_schema.key_column_usage kcu
+              ON kcu.constraint_schema = rc.constraint_schema AND kcu.constraint_name = rc.constraint_name
+            WHERE rc.constraint_schema = DATABASE() AND rc.table_name = %s
+              AND rc.referenced_table_name = %s AND kcu.column_name = %s
+        """, (table, parent, column))
+        existing = cursor.fetchall()
+        if any(rule == 'CASCADE' for _, rule in existing):
+            return
+        drops = ''.join(f"DROP FOREIGN KEY {constraint}, " for constraint, _ in existing)
+        cursor.execute(
+            f"ALTER TABLE {table} {drops}"
+            f"ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {parent} (id) ON DELETE CASCADE"
+        )
+    return step
+
+
+def backfill_document_columns(cursor, batch_size=500):
+    """Fill the documents file columns from the legacy ``metadata`` JSON and the files on disk."""
+    cursor.execute("SELECT id, metadata FROM documents WHERE file_path IS NULL")
+    rows = cursor.fetchall()
+    updates = []
+    for document_id, metadata in rows:
+        try:
+            file_path = json.loads(metadata)['file_path']
+        except (TypeError, ValueError, KeyError):
+            logging.warning(f"Document {document_id} has no usable metadata, leaving it unbackfilled")
+            continue
+
+        file_size = content_hash = uploaded_at = None
+        if os.path.exists(file_path):
+            digest = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            content_hash = digest.hexdigest()
+            file_size = os.path.getsize(file_path)
+            uploaded_at = datetime.fromtimestamp(os.path.getmtime(file_path))
+        else:
+            logging.warning(f"File for document {document_id} does not exist: {file_path}")
+        updates.append((file_path, os.path.basename(file_path), file_size, content_hash, uploaded_at, document_id))
+
+    for start in range(0, len(updates), batch_size):
+        cursor.executemany("""
+            UPDATE documents
+            SET file_path = %s, file_name = %s, file_size = %s, content_hash = %s,
+                uploaded_at = COALESCE(%s, uploaded_at)
+            WHERE id = %s
+        """, updates[start:start + batch_size])
+
+
+# Schema changes for the tables managed through mysql.connector (projects, tasks,
+# documents, ...) and column additions to SQLAlchemy models, which
+# db.create_all() does not apply to existing tables. Each entry is (id, steps); a step is a SQL string or a
+# callable taking a cursor. Applied in order, once, and recorded in
+# schema_migrations. DDL commits implicitly in MySQL, so steps should be safe
+# to re-run after a partial failure.
+MIGRATIONS = [
+    ("0001_projects_list_indexes", [
+        create_index("projects", "idx_projects_location", "location, project_id"),
+        create_index("projects", "idx_projects_type", "project_type, project_id"),
+        create_index("projects", "idx_projects_start_date", "start_date, project_id"),
+    ]),
+    ("0002_tasks_status_index", [
+        # Covers the per-project and per-phase completion aggregates
+        create_index("tasks", "idx_tasks_project_phase", "project_id, phase, completed"),
+    ]),
+    ("0003_documents_columns", [
+        # First-class columns replacing the metadata JSON for reads and filters
+        add_column("documents", "file_path", "VARCHAR(1024) NULL"),
+        add_column("documents", "file_name", "VARCHAR(255) NULL"),
+        add_column("documents", "file_size", "BIGINT NULL"),
+        add_column("documents", "content_hash", "CHAR(64) NULL"),
+        add_column("documents", "project_id", "INT NULL"),
+        add_column("documents", "uploaded_at", "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP"),
+        backfill_document_columns,
+        create_index("documents", "idx_documents_role", "role, id"),
+        create_index("documents", "idx_documents_project", "project_id, id"),
+        create_index("documents", "idx_documents_uploaded_at", "uploaded_at, id"),
+        create_index("documents", "idx_documents_content_hash", "content_hash"),
+    ]),
+    ("0004_documents_file_name_index", [
+        # Blob-stored files are served by their uploaded name
+        create_index("documents", "idx_documents_file_name", "file_name, id"),
+    ]),
+    ("0005_notification_outbox", [
+        # db.create_all() does not add columns to an existing notification table
+        add_column("notification", "attempts", "INT NOT NULL DEFAULT 0"),
+        add_column("notification", "next_attempt_at", "DATETIME NULL"),
+        add_column("notification", "last_error", "TEXT NULL"),
+        # Queued notifications have not been sent yet
+        "ALTER TABLE notification MODIFY COLUMN sent_at DATETIME NULL",
+        create_index("notification", "idx_notification_outbox", "status, next_attempt_at"),
+    ]),
+    ("0006_meeting_calendar_indexes", [
+        create_index("meeting", "idx_meeting_date_time", "date_time"),
+        create_index("meeting", "idx_meeting_client_date", "client_name, date_time"),
+        create_index("meeting", "idx_meeting_status_date", "status, date_time"),
+        create_index("meeting", "idx_meeting_location_date", "location, date_time"),
+    ]),
+    ("0007_notification_cascade", [
+        # Deleting a meeting removes its notifications in the same statement
+        cascade_foreign_key("notification", "meeting_id", "meeting", "fk_notification_meeting"),
+    ]),
+    ("0008_meeting_duration", [
+        add_column("meeting", "duration_minutes", "INT NOT NULL DEFAULT 60"),
+        add_column("meeting", "end_time", "DATETIME NULL"),
+        "UPDATE meeting SET end_time = DATE_ADD(date_time, INTERVAL duration_minutes MINUTE) WHERE end_time IS NULL",
+    ]),
+    ("0009_task_scheduling", [
+        add_column("tasks", "duration_days", "INT NOT NULL DEFAULT 1"),
+        # project_id is denormalised so a project's dependencies load with one indexed query
+        """
+        CREATE TABLE IF NOT EXISTS task_dependencies (
+            project_id INT NOT NULL,
+            task_id INT NOT NULL,
+            depends_on_task_id INT NOT NULL,
+            PRIMARY KEY (task_id, depends_on_task_id),
+            INDEX idx_task_dependencies_project (project_id),
+            INDEX idx_task_dependencies_depends_on (depends_on_task_id)
+        )
+        """,
+    ]),
+    ("0010_project_import_batch", [
+        # Tags the rows of one import so their ids are read back instead of assumed consecutive
+        add_column("projects", "import_batch", "CHAR(32) NULL"),
+        add_column("projects", "import_row", "INT NULL"),
+        create_index("projects", "idx_projects_import_batch", "import_batch, import_row"),
+    ]),
+    ("0011_task_import_batch", [
+        # Same for tasks created by /tasks/bulk
+        add_column("tasks", "import_batch", "CHAR(32) NULL"),
+        add_column("tasks", "import_row", "INT NULL"),
+        create_index("tasks", "idx_tasks_import_batch", "import_batch, import_row"),
+    ]),
+]
+
+
+def run_migrations(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                id VARCHAR(100) PRIMARY KEY,
+                applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("SELECT id FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
+
+        for migration_id, steps in MIGRATIONS:
+            if migration_id in applied:
+                continue
+            logging.info(f"Applying migration {migration_id}")
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute("INSERT INTO schema_migrations (id) VALUES (%s)", (migration_id,))
+            conn.commit()
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
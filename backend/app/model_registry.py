@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+
+from flask import jsonify
+
+
+class ModelNotReady(Exception):
+    """Raised when an asset is still loading and the caller did not want to wait, or its last load failed recently."""
+
+
+class ModelRegistry:
+    """Loads heavy assets (ML models, embeddings) lazily or in a background warm-up.
+
+    Blueprints register a loader at import time instead of loading at import,
+    so workers can start serving CRUD routes immediately. ``get`` loads an
+    asset on first use (or waits for the warm-up thread to finish it) and
+    ``/ready`` reports whether every registered asset is loaded. After a
+    failed load, the asset is not tried again for ``MODEL_RETRY_SECONDS``.
+    """
+
+    def __init__(self, app=None):
+        self._loaders = {}
+        self._assets = {}
+        self._errors = {}
+        self._load_times = {}
+        self._failed_at = {}
+        self.retry_seconds = 30
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MODEL_WARMUP', True)
+        app.config.setdefault('MODEL_RETRY_SECONDS', 30)
+        self.retry_seconds = app.config['MODEL_RETRY_SECONDS']
+        app.extensions['model_registry'] = self
+        app.add_url_rule('/ready', 'ready', self._ready_view)
+        if app.config['MODEL_WARMUP']:
+            self.warm_up()
+
+    def register(self, name, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def _load(self, name):
+        started = time.perf_counter()
+        try:
+            asset = self._loaders[name]()
+        except Exception as e:
+            logging.exception(f"Failed to load {name}")
+            self._errors[name] = str(e)
+            self._failed_at[name] = time.monotonic()
+            raise
+        self._assets[name] = asset
+        self._errors.pop(name, None)
+        self._failed_at.pop(name, None)
+        self._load_times[name] = round(time.perf_counter() - started, 3)
+        logging.info(f"Loaded {name} in {self._load_times[name]}s")
+        return asset
+
+    def _backing_off(self, name):
+        failed_at = self._failed_at.get(name)
+        return failed_at is not None and time.monotonic() - failed_at < self.retry_seconds
+
+    def get(self, name, timeout=None):
+        asset = self._assets.get(name)
+        if asset is not None:
+            return asset
+
+        lock = self._locks[name]
+        if not lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise ModelNotReady(f"{name} is still loading")
+        try:
+            if name in self._assets:
+                return self._assets[name]
+            if self._backing_off(name):
+                raise ModelNotReady(f"{name} failed to load: {self._errors.get(name)}")
+            return self._load(name)
+        finally:
+            lock.release()
+
+    def reload(self, name, if_stale=None):
+        """Load ``name`` again.
+
+        ``if_stale`` is checked against the loaded asset under the asset's lock;
+        when it returns False the asset is kept. Callers racing to reload the
+        same change therefore wait for the first one and reuse its result.
+        While a failed load is backing off, the loaded asset is kept as well.
+        """
+        with self._locks[name]:
+            asset = self._assets.get(name)
+            if if_stale is not None and asset is not None and not if_stale(asset):
+                return asset
+            if asset is not None and self._backing_off(name):
+                return asset
+            return self._load(name)
+
+    def warm_up(self, names=None):
+        """Load the given (default: all) registered assets in a daemon thread."""
+        def run():
+            for name in names or list(self._loaders):
+                try:
+                    self.get(name)
+                except Exception:
+                    pass
+
+        thread = threading.Thread(target=run, name='model-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        states = {}
+        for name in self._loaders:
+            if name in self._assets:
+                states[name] = {'state': 'loaded', 'load_seconds': self._load_times.get(name)}
+            elif name in self._errors:
+                states[name] = {'state': 'failed', 'error': self._errors[name]}
+            elif self._locks[name].locked():
+                states[name] = {'state': 'loading'}
+            else:
+                states[name] = {'state': 'pending'}
+        return states
+
+    def is_ready(self):
+        return all(name in self._assets for name in self._loaders)
+
+    def _ready_view(self):
+        ready = self.is_ready()
+        return jsonify({
+            'ready': ready,
+            'uptime_seconds': round(time.monotonic() - self._started_at, 3),
+            'models': self.status()
+        }), 200 if ready else 503
+
+
+model_registry = ModelRegistry()
@@ -1,5 +1,4 @@
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
 
 db = SQLAlchemy()
 
@@ -9,18 +8,41 @@ class Meeting(db.Model):
     place = db.Column(db.String(255), nullable=False)
     location = db.Column(db.String(255), nullable=False)
     date_time = db.Column(db.DateTime, nullable=False)
+    duration_minutes = db.Column(db.Integer, default=60, nullable=False)
+    end_time = db.Column(db.DateTime)
     client_name = db.Column(db.String(255), nullable=False)
     status = db.Column(db.String(50), default="Scheduled", nullable=False)
     agenda = db.Column(db.Text, nullable=False)
     notes = db.Column(db.Text)
 
-    notifications = db.relationship("Notification", backref="meeting", lazy=True)
+    # Notifications go with their meeting in the database (ON DELETE CASCADE); passive_deletes
+    # stops the ORM from loading them just to delete them
+    notifications = db.relationship(
+        "Notification", backref="meeting", lazy="select", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    # Calendar queries filter on one column and scan a date_time range within it
+    __table_args__ = (
+        db.Index("idx_meeting_date_time", "date_time"),
+        db.Index("idx_meeting_client_date", "client_name", "date_time"),
+        db.Index("idx_meeting_status_date", "status", "date_time"),
+        db.Index("idx_meeting_location_date", "location", "date_time"),
+    )
 
 class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    meeting_id = db.Column(db.Integer, db.ForeignKey("meeting.id"), nullable=False)
+    meeting_id = db.Column(db.Integer, db.ForeignKey("meeting.id", ondelete="CASCADE"), nullable=False)
     notification_type = db.Column(db.String(50), nullable=False)
     recipient = db.Column(db.String(255), nullable=False)
     message = db.Column(db.Text, nullable=False)
-    sent_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Set by the outbox on delivery; NULL while the notification is queued
+    sent_at = db.Column(db.DateTime)
     status = db.Column(db.String(50), default="Sent", nullable=False)
+    # Outbox delivery state: Pending/Sending rows are picked up once next_attempt_at has passed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index("idx_notification_outbox", "status", "next_attempt_at"),
+    )
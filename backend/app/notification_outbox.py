@@ -0,0 +1,240 @@
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+
+from flask import jsonify
+from sqlalchemy.orm import Session
+
+from .models import db, Notification
+
+PENDING = "Pending"
+SENDING = "Sending"
+SENT = "Sent"
+FAILED = "Failed"
+
+
+class LogSink:
+    """Default sink: writes each notification to the log instead of delivering it."""
+
+    def send(self, notification):
+        logging.info(
+            f"Notification {notification.id} ({notification.notification_type}) "
+            f"to {notification.recipient}: {notification.message}"
+        )
+
+
+class MemorySink:
+    """Keeps delivered notifications in memory; ``fail_times`` makes the first sends fail, for testing retries."""
+
+    def __init__(self, fail_times=0):
+        self.fail_times = fail_times
+        self.delivered = []
+        self._lock = threading.Lock()
+
+    def send(self, notification):
+        with self._lock:
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise RuntimeError("MemorySink configured to fail")
+            self.delivered.append({
+                'id': notification.id,
+                'notification_type': notification.notification_type,
+                'recipient': notification.recipient,
+                'message': notification.message
+            })
+
+
+class NotificationOutbox:
+    """Delivers queued ``Notification`` rows from a pool of background workers.
+
+    Request handlers only insert a ``Pending`` row in the same transaction as
+    the data it is about and call ``wake()``. Workers claim due rows in
+    batches (``FOR UPDATE SKIP LOCKED``, so several workers or processes never
+    claim the same row), mark them ``Sending`` with a lease, deliver them
+    through the configured sink and record the outcome. Failures are retried
+    with exponential backoff until ``NOTIFICATION_MAX_ATTEMPTS``, then marked
+    ``Failed``; rows left ``Sending`` by a crashed worker are picked up again
+    when their lease runs out.
+    """
+
+    def __init__(self, app=None):
+        self._app = None
+        self._sinks = {'log': LogSink(), 'memory': MemorySink()}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._workers = []
+        self._started = False
+        self._lock = threading.Lock()
+        self._stats = {'batches': 0, 'sent': 0, 'retried': 0, 'failed': 0, 'errors': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('NOTIFICATION_SINK', 'log')
+        app.config.setdefault('NOTIFICATION_WORKERS', 2)
+        app.config.setdefault('NOTIFICATION_BATCH_SIZE', 50)
+        app.config.setdefault('NOTIFICATION_MAX_ATTEMPTS', 5)
+        app.config.setdefault('NOTIFICATION_RETRY_BASE_SECONDS', 2)
+        app.config.setdefault('NOTIFICATION_RETRY_MAX_SECONDS', 600)
+        app.config.setdefault('NOTIFICATION_LEASE_SECONDS', 60)
+        app.config.setdefault('NOTIFICATION_POLL_SECONDS', 5)
+        app.config.setdefault('NOTIFICATION_WORKERS_AUTOSTART', True)
+        self._app = app
+        app.extensions['notification_outbox'] = self
+        app.add_url_rule('/notifications/outbox/stats', 'notification_outbox_stats', self._stats_view)
+        if app.config['NOTIFICATION_WORKERS_AUTOSTART']:
+            # Not from create_app: run.py creates tables and runs migrations after it, and
+            # processes that only import the app (tests, CLI, pre-fork masters) never serve requests
+            app.before_request(self._start_once)
+
+    def register_sink(self, name, sink):
+        """Make ``sink`` (anything with ``send(notification)``) selectable through ``NOTIFICATION_SINK``."""
+        self._sinks[name] = sink
+
+    @property
+    def sink(self):
+        return self._sinks[self._app.config['NOTIFICATION_SINK']]
+
+    def _start_once(self):
+        if not self._started:
+            self.start()
+
+    def start(self):
+        with self._lock:
+            self._started = True
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            self._stop.clear()
+            for index in range(len(self._workers), self._app.config['NOTIFICATION_WORKERS']):
+                worker = threading.Thread(target=self._run, name=f'notification-worker-{index}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def wake(self):
+        """Tell idle workers there is new work instead of waiting for the next poll."""
+        self._wake.set()
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                with self._app.app_context():
+                    processed = self.process_batch()
+                failures = 0
+            except Exception:
+                # Usually the database being unreachable; back off instead of spinning
+                failures += 1
+                processed = 0
+                with self._lock:
+                    self._stats['errors'] += 1
+                logging.exception("Notification worker failed to process a batch")
+            if processed:
+                continue
+            poll = self._app.config['NOTIFICATION_POLL_SECONDS'] * min(2 ** failures, 32)
+            if self._wake.wait(poll):
+                self._wake.clear()
+
+    def _claim(self, session, now):
+        config = self._app.config
+        batch = (
+            session.query(Notification)
+            .filter(Notification.status.in_([PENDING, SENDING]), Notification.next_attempt_at <= now)
+            .order_by(Notification.next_attempt_at)
+            .limit(config['NOTIFICATION_BATCH_SIZE'])
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        lease_until = now + timedelta(seconds=config['NOTIFICATION_LEASE_SECONDS'])
+        for notification in batch:
+            notification.status = SENDING
+            notification.next_attempt_at = lease_until
+        session.commit()
+        return batch
+
+    def _backoff(self, attempts):
+        config = self._app.config
+        delay = min(config['NOTIFICATION_RETRY_BASE_SECONDS'] * 2 ** (attempts - 1), config['NOTIFICATION_RETRY_MAX_SECONDS'])
+        # Jitter keeps retries from a burst of failures from arriving together
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    def process_batch(self):
+        """Claim and deliver one batch of due notifications; returns how many were processed."""
+        # The claimed rows stay loaded across the claim commit; with the default
+        # expire-on-commit every row would be reloaded by its own SELECT
+        with Session(db.engine, expire_on_commit=False) as session:
+            return self._deliver(session, self._claim(session, datetime.utcnow()))
+
+    def _deliver(self, session, batch):
+        if not batch:
+            return 0
+
+        sink = self.sink
+        max_attempts = self._app.config['NOTIFICATION_MAX_ATTEMPTS']
+        sent = retried = failed = 0
+        for notification in batch:
+            notification.attempts += 1
+            try:
+                sink.send(notification)
+            except Exception as e:
+                notification.last_error = str(e)[:1000]
+                if notification.attempts >= max_attempts:
+                    notification.status = FAILED
+                    notification.next_attempt_at = None
+                    failed += 1
+                    logging.error(f"Notification {notification.id} failed after {notification.attempts} attempts: {e}")
+                else:
+                    notification.status = PENDING
+                    notification.next_attempt_at = datetime.utcnow() + self._backoff(notification.attempts)
+                    retried += 1
+                continue
+            notification.status = SENT
+            notification.sent_at = datetime.utcnow()
+            notification.next_attempt_at = None
+            notification.last_error = None
+            sent += 1
+        session.commit()
+
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['sent'] += sent
+            self._stats['retried'] += retried
+            self._stats['failed'] += failed
+        return len(batch)
+
+    def drain(self):
+        """Deliver everything that is due now, in the calling thread. Returns the number processed."""
+        total = 0
+        while True:
+            processed = self.process_batch()
+            if not processed:
+                return total
+            total += processed
+
+    def stats(self):
+        counts = dict(
+            db.session.query(Notification.status, db.func.count(Notification.id))
+            .filter(Notification.status.in_([PENDING, SENDING, FAILED]))
+            .group_by(Notification.status)
+            .all()
+        )
+        with self._lock:
+            return dict(
+                self._stats,
+                workers=sum(worker.is_alive() for worker in self._workers),
+                sink=self._app.config['NOTIFICATION_SINK'],
+                pending=counts.get(PENDING, 0),
+                sending=counts.get(SENDING, 0),
+                failed_total=counts.get(FAILED, 0)
+            )
+
+    def _stats_view(self):
+        return jsonify(self.stats())
+
+
+notification_outbox = NotificationOutbox()
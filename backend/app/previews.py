@@ -0,0 +1,159 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_QUALITY = 80
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tif', '.tiff'}
+PDF_EXTENSIONS = {'.pdf'}
+
+
+def can_preview(file_name):
+    extension = os.path.splitext(file_name or '')[1].lower()
+    return extension in IMAGE_EXTENSIONS or extension in PDF_EXTENSIONS
+
+
+def render_image(source_path, size):
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as image:
+        # JPEGs can be decoded straight at a reduced scale, far cheaper than a full decode
+        image.draft('RGB', (size[0] * 2, size[1] * 2))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(size)
+        return image.convert('RGB')
+
+
+def render_pdf(source_path, size):
+    """First page of a PDF, if PyMuPDF is installed; None otherwise."""
+    try:
+        import fitz
+    except ImportError:
+        return None
+    from PIL import Image
+
+    with fitz.open(source_path) as pdf:
+        if not pdf.page_count:
+            return None
+        page = pdf[0]
+        scale = min(size[0] / page.rect.width, size[1] / page.rect.height) * 2
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+        image = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+    image.thumbnail(size)
+    return image
+
+
+class PreviewGenerator:
+    """Builds JPEG thumbnails of uploaded documents on a small worker pool.
+
+    Previews are keyed by content hash, so documents sharing a blob share a
+    preview and each one is rendered at most once. ``submit`` is called on
+    upload; ``get`` returns the cached file, waiting briefly for a render in
+    progress. Pillow is needed for images and PyMuPDF (``fitz``) for PDFs;
+    without them no previews are made and ``get`` reports none.
+    """
+
+    def __init__(self, cache_dir, size=THUMBNAIL_SIZE, max_workers=2):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_workers = max_workers
+        os.makedirs(cache_dir, exist_ok=True)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._unavailable = set()
+        self._stats = {'generated': 0, 'failed': 0, 'unsupported': 0}
+
+    def path(self, content_hash):
+        return os.path.join(self.cache_dir, content_hash[:2], f"{content_hash}_{self.size[0]}.jpg")
+
+    def _render(self, content_hash, source_path, file_name):
+        extension = os.path.splitext(file_name)[1].lower()
+        try:
+            if extension in PDF_EXTENSIONS:
+                image = render_pdf(source_path, self.size)
+            else:
+                image = render_image(source_path, self.size)
+        except ImportError:
+            image = None
+        except Exception:
+            return self._failed(content_hash, file_name)
+
+        if image is None:
+            with self._lock:
+                self._stats['unsupported'] += 1
+                self._unavailable.add(content_hash)
+            return None
+
+        preview_path = self.path(content_hash)
+        tmp_path = f"{preview_path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(preview_path), exist_ok=True)
+            image.save(tmp_path, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+            os.replace(tmp_path, preview_path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            return self._failed(content_hash, file_name)
+        with self._lock:
+            self._stats['generated'] += 1
+        return preview_path
+
+    def _failed(self, content_hash, file_name):
+        logging.exception(f"Preview generation failed for {file_name}")
+        with self._lock:
+            self._stats['failed'] += 1
+            self._unavailable.add(content_hash)
+        return None
+
+    def _run(self, content_hash, source_path, file_name):
+        try:
+            return self._render(content_hash, source_path, file_name)
+        finally:
+            with self._lock:
+                self._pending.pop(content_hash, None)
+
+    def submit(self, content_hash, source_path, file_name):
+        """Queue a preview unless it is cached, in progress or not possible. Returns a Future or None."""
+        if not content_hash or not can_preview(file_name) or os.path.exists(self.path(content_hash)):
+            return None
+        with self._lock:
+            if content_hash in self._unavailable:
+                return None
+            if content_hash in self._pending:
+                return self._pending[content_hash]
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='preview')
+            future = self._executor.submit(self._run, content_hash, source_path, file_name)
+            self._pending[content_hash] = future
+            return future
+
+    def get(self, content_hash, source_path, file_name, timeout=2.0):
+        """``(path, status)`` where status is ``ready``, ``pending`` or ``unavailable``."""
+        preview_path = self.path(content_hash) if content_hash else None
+        if preview_path and os.path.exists(preview_path):
+            return preview_path, 'ready'
+        future = self.submit(content_hash, source_path, file_name)
+        if future is None:
+            return None, 'unavailable'
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return None, 'pending'
+        return (result, 'ready') if result else (None, 'unavailable')
+
+    def discard(self, content_hash):
+        """Drop the cached preview once nothing references the content any more."""
+        try:
+            os.remove(self.path(content_hash))
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._unavailable.discard(content_hash)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending))
@@ -0,0 +1,78 @@
+import logging
+
+from flask import current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when an endpoint issues more SQL statements than its budget."""
+
+
+def query_budget(max_queries):
+    """Declare how many SQLAlchemy statements a view may issue per request."""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+class QueryCounter:
+    """Counts SQLAlchemy statements per request and checks them against ``@query_budget``.
+
+    Every response gets an ``X-Query-Count`` header. Over budget, a warning is
+    logged, or with ``QUERY_BUDGET_STRICT`` the request fails;
+    tests/test_query_budgets.py checks the header against each budget so N+1
+    regressions fail the suite. Only statements issued before the response is
+    returned are counted; rows pulled by a streamed body are not. mysql.connector blueprints are not covered.
+    """
+
+    def __init__(self, app=None):
+        self._listening = False
+        self._violations = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUERY_BUDGET_STRICT', False)
+        app.extensions['query_counter'] = self
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._count)
+            self._listening = True
+        app.before_request(self._reset)
+        app.after_request(self._check)
+        app.add_url_rule('/query_budget/stats', 'query_budget_stats', self._stats_view)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'query_count' in g:
+            g.query_count += 1
+
+    def _reset(self):
+        g.query_count = 0
+
+    @staticmethod
+    def budget_for(app, endpoint):
+        view = app.view_functions.get(endpoint)
+        return getattr(view, 'query_budget', None)
+
+    def _check(self, response):
+        count = g.get('query_count', 0)
+        response.headers['X-Query-Count'] = str(count)
+        budget = self.budget_for(current_app, request.endpoint)
+        if budget is not None and count > budget:
+            self._violations[request.endpoint] = max(count, self._violations.get(request.endpoint, 0))
+            message = f"{request.method} {request.path} issued {count} queries, budget is {budget}"
+            if current_app.config['QUERY_BUDGET_STRICT']:
+                raise QueryBudgetExceeded(message)
+            logging.warning(message)
+        return response
+
+    def violations(self):
+        """Highest query count seen per endpoint that went over its budget."""
+        return dict(self._violations)
+
+    def _stats_view(self):
+        return jsonify({'violations': self.violations()})
+
+
+query_counter = QueryCounter()
@@ -4,7 +4,11 @@ from flask_cors import CORS
 import os
 
 import json
-from sentence_transformers import SentenceTransformer, util
+from ..model_registry import model_registry
+from ..vector_index import build_index
+from ..embedding_cache import load_embeddings
+from ..keyword_matcher import KeywordMatcher
+from ..micro_batcher import MicroBatcher
 
 chatbot_bp = Blueprint('chatbot', __name__)
 CORS(chatbot_bp)
@@ -12,24 +16,67 @@ CORS(chatbot_bp)
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 dataset_path = os.path.join(BASE_DIR, "construction_dataset.json")
 
-# Check if dataset file exists
-if not os.path.exists(dataset_path):
-    raise FileNotFoundError(f"Dataset file not found: {dataset_path}")
+MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_CACHE_DIR = os.environ.get("CHATBOT_EMBEDDING_CACHE", os.path.join(BASE_DIR, "embedding_cache"))
 
-# Load dataset
-with open(dataset_path, "r", encoding="utf-8") as f:
-    data = json.load(f)
+# "exact" scores every FAQ entry, "ivf" probes the nearest clusters, "auto" picks by dataset size
+INDEX_KIND = os.environ.get("CHATBOT_INDEX", "auto")
+SIMILARITY_THRESHOLD = 0.7
+ENCODE_MAX_BATCH_SIZE = int(os.environ.get("CHATBOT_ENCODE_BATCH_SIZE", 32))
+ENCODE_MAX_WAIT_MS = float(os.environ.get("CHATBOT_ENCODE_MAX_WAIT_MS", 5))
+MAX_TOP_K = 20
 
 
-# Load model
-model = SentenceTransformer("all-MiniLM-L6-v2")
 
-# Precompute embeddings for dataset queries
-dataset_queries = [item["query"] for item in data]
-query_embeddings = model.encode(dataset_queries, convert_to_tensor=True)
+def load_chatbot():
+    # Imported here: pulling in sentence_transformers (and torch) is a large part of boot time
+    from sentence_transformers import SentenceTransformer
 
-# Create a dictionary for quick keyword-based matching
-keyword_responses = {item["query"].lower(): item["response"] for item in data}
+    # Check if dataset file exists
+    if not os.path.exists(dataset_path):
+        raise FileNotFoundError(f"Dataset file not found: {dataset_path}")
+
+    # Load dataset
+    with open(dataset_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    # Load model
+    model = SentenceTransformer(MODEL_NAME)
+
+    # Dataset query embeddings come from the on-disk cache; only new or edited entries are encoded
+    dataset_queries = [item["query"] for item in data]
+    query_embeddings = load_embeddings(
+        dataset_queries,
+        lambda texts: model.encode(texts, convert_to_numpy=True),
+        MODEL_NAME,
+        EMBEDDING_CACHE_DIR
+    )
+    index = build_index(query_embeddings, kind=INDEX_KIND, normalized=True)
+
+    # Concurrent /chat queries arriving within a few ms share one encode() call
+    query_encoder = MicroBatcher(
+        lambda texts: model.encode(texts, convert_to_numpy=True),
+        max_batch_size=ENCODE_MAX_BATCH_SIZE,
+        max_wait_ms=ENCODE_MAX_WAIT_MS,
+        name="chat-encoder"
+    )
+
+    # Create a dictionary for quick keyword-based matching, plus an automaton over its keys
+    keyword_responses = {item["query"].lower(): item["response"] for item in data}
+    keyword_matcher = KeywordMatcher(keyword_responses)
+
+    return {
+        "data": data,
+        "model": model,
+        "query_encoder": query_encoder,
+        "index": index,
+        "keyword_responses": keyword_responses,
+        "keyword_matcher": keyword_matcher
+    }
+
+
+# Loaded on first use or by the warm-up thread started in create_app()
+model_registry.register("chatbot", load_chatbot)
 
 @chatbot_bp.route("/")
 def home():
@@ -38,25 +85,50 @@ def home():
 @chatbot_bp.route("/chat", methods=["POST"])
 def chat():
     user_query = request.json.get("query", "").lower()
+    top_k = request.json.get("top_k", 1)
+    try:
+        if isinstance(top_k, (bool, float)):
+            raise ValueError
+        top_k = min(max(int(top_k), 1), MAX_TOP_K)
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_k must be an integer"}), 400
+
+    chatbot = model_registry.get("chatbot")
+    data = chatbot["data"]
+    query_encoder = chatbot["query_encoder"]
+    index = chatbot["index"]
+    keyword_responses = chatbot["keyword_responses"]
+    keyword_matcher = chatbot["keyword_matcher"]
 
     # Compute the embedding for the user query
-    user_query_embedding = model.encode(user_query, convert_to_tensor=True)
+    user_query_embedding = query_encoder(user_query)
 
-    # Find the closest match using cosine similarity
-    similarities = util.cos_sim(user_query_embedding, query_embeddings)
-    best_match_idx = similarities.argmax().item()
+    # Find the closest matches by cosine similarity
+    scores, ids = index.search(user_query_embedding, k=top_k)
+    matches = [
+        {"query": data[i]["query"], "response": data[i]["response"], "score": round(float(score), 4)}
+        for score, i in zip(scores[0], ids[0]) if i >= 0
+    ]
 
     # If similarity is high, return dataset response
-    if similarities[0][best_match_idx] > 0.7:
-        return jsonify({"response": data[best_match_idx]["response"]})
+    if matches and scores[0][0] > SIMILARITY_THRESHOLD:
+        result = {"response": matches[0]["response"]}
+        if top_k > 1:
+            result["matches"] = matches
+        return jsonify(result)
 
-    # If no close match → Check for keywords
-    for keyword in keyword_responses:
-        if keyword in user_query:
-            return jsonify({"response": keyword_responses[keyword]})
+    # If no close match → Check for keywords (longest FAQ key found in the query wins)
+    keyword = keyword_matcher.best_match(user_query)
+    if keyword:
+        return jsonify({"response": keyword_responses[keyword]})
 
     # If nothing matches → Fallback response
     return jsonify({"response": "Sorry, I didn't understand that. Can you rephrase?"})
 
+@chatbot_bp.route("/chat/stats", methods=["GET"])
+def chat_stats():
+    chatbot = model_registry.get("chatbot")
+    return jsonify({"encoder": chatbot["query_encoder"].stats()})
+
 if __name__ == "_main_":
     chatbot_bp.run(debug=True)
\ No newline at end of file
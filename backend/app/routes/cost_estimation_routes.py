@@ -1,151 +1,266 @@
 from flask import Blueprint, request, jsonify
 from flask_cors import CORS
 import joblib
-import pandas as pd
+import numpy as np
 import os
+import warnings
+from collections import namedtuple
+from ..feature_encoder import CostFeatureEncoder
+from ..forest_engine import CompiledForest, file_digest
+from ..prediction_cache import LRUCache
+from ..model_registry import model_registry
 
 cost_estimation_bp = Blueprint('cost_estimation', __name__)
 
 # Define base directory (backend folder)
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))  
 
-# Correct dataset path
-dataset_path = os.path.join(BASE_DIR, "Updated_Construction_Cost_Prediction_Dataset.csv")
-
-# Load dataset
-if os.path.exists(dataset_path):
-    data = pd.read_csv(dataset_path)
-    print("✅ Dataset loaded successfully!")
-else:
-    print(f"⚠️ WARNING: Dataset file not found at {dataset_path}")
-    data = None  # Handle missing dataset
-
 # Load trained model
 model_path = os.path.join(BASE_DIR, "improved_construction_cost_model_v6.pkl")
+compiled_model_path = os.path.join(BASE_DIR, "improved_construction_cost_model_v6.npz")
+
+# "compiled" evaluates the flattened forest with NumPy, "sklearn" uses RandomForestRegressor.predict
+MODEL_ENGINE = os.environ.get("COST_MODEL_ENGINE", "compiled")
 
 print(f"🔍 Looking for model at: {model_path}")  # Debugging line
 
-try:
-    model = joblib.load(model_path)
-    print("✅ Model loaded successfully!")
-except FileNotFoundError:
-    print(f"❌ ERROR: Model file not found at {model_path}")
-    model = None
+
+def load_model():
+    if MODEL_ENGINE == "compiled" and os.path.exists(compiled_model_path):
+        compiled = CompiledForest.load(compiled_model_path)
+        if not os.path.exists(model_path) or compiled.source_digest == file_digest(model_path):
+            return compiled
+        print("⚠️ WARNING: Compiled model is out of date, recompiling from the pickled model")
+
+    sklearn_model = joblib.load(model_path)
+    if MODEL_ENGINE == "compiled":
+        return CompiledForest.from_sklearn(sklearn_model)
+    return sklearn_model
+
+
+def load_encoder(model):
+    # Feature encoder saved by train_model.py next to the model
+    if os.path.exists(encoder_path):
+        encoder = CostFeatureEncoder.load(encoder_path)
+    else:
+        print(f"⚠️ WARNING: Feature encoder not found at {encoder_path}, using default categories")
+        encoder = CostFeatureEncoder()
+
+    if model is not None and encoder.feature_names != list(model.feature_names_in_):
+        print("⚠️ WARNING: Feature encoder does not match the model features, realigning to the model")
+        encoder = CostFeatureEncoder(categories=encoder.categories, feature_names=model.feature_names_in_)
+    return encoder
+
+
+def model_files_signature():
+    """mtimes of the files a loaded model depends on; a change means the model must be reloaded."""
+    return tuple(
+        os.path.getmtime(path) if os.path.exists(path) else None
+        for path in (model_path, compiled_model_path, encoder_path)
+    )
+
+
+CostModel = namedtuple('CostModel', ['model', 'encoder', 'version', 'signature'])
+
+
+def load_cost_model():
+    signature = model_files_signature()
+    try:
+        model = load_model()
+        print(f"✅ Model loaded successfully! (engine: {MODEL_ENGINE})")
+    except FileNotFoundError:
+        print(f"❌ ERROR: Model file not found at {model_path}")
+        model = None
+
+    version = file_digest(model_path) if os.path.exists(model_path) else None
+    prediction_cache.clear()
+    return CostModel(model, load_encoder(model), version, signature)
+
+
+def cost_model_stale(cost_model):
+    return model_files_signature() != cost_model.signature
+
+
+def current_cost_model():
+    """The loaded cost model, reloaded first if its files changed on disk.
+
+    If the reload fails (e.g. a half-written file), the previous model keeps
+    serving and the registry waits before trying again.
+    """
+    cost_model = model_registry.get('cost_model')
+    if cost_model_stale(cost_model):
+        try:
+            # Re-checked under the registry lock, so only the first request to notice reloads
+            cost_model = model_registry.reload('cost_model', if_stale=cost_model_stale)
+        except Exception as e:
+            print(f"⚠️ WARNING: Reloading the cost model failed ({e}), serving version {cost_model.version}")
+    return cost_model
+
+
+encoder_path = os.path.join(BASE_DIR, "cost_feature_encoder.json")
+
+# Repeat lookups from the Dashboard skip feature construction and model.predict entirely
+prediction_cache = LRUCache(
+    maxsize=int(os.environ.get("PREDICTION_CACHE_SIZE", 4096)),
+    ttl=float(os.environ.get("PREDICTION_CACHE_TTL", 3600))
+)
+
+# Loaded on first use or by the warm-up thread started in create_app()
+model_registry.register('cost_model', load_cost_model)
+
+REQUIRED_KEYS = ['area', 'floors', 'location', 'quality', 'construction_type', 'approx_cost']
+
+# Multiplier applied on top of the model output, by construction type
+TYPE_MULTIPLIERS = {
+    'Residential': 1.0,
+    'Industrial': 1.25,
+    'Commercial': 1.5
+}
+
+# Share of the final cost attributed to each cost head
+PERCENTAGES = {
+    'Cement': 13.0,
+    'Sand': 8.3,
+    'Aggregate': 5.6,
+    'Steel': 15.7,
+    'Paint': 2.8,
+    'Bricks': 6.5,
+    'Flooring': 4.6,
+    'Windows': 2.8,
+    'Doors': 3.7,
+    'Transportation Costs': 4.6,
+    'Architect & Design Costs': 6.5,
+    'Labor Costs': 21.3,
+    'Miscellaneous Costs': 4.6
+}
+
+MAX_BATCH_SIZE = 1000
+
+# The model was fitted on a DataFrame; we feed it a plain ndarray in feature_names_in_ order.
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def validate_input(input_data, encoder):
+    """Return an error message for a malformed prediction input, or None if it is usable."""
+    if not isinstance(input_data, dict):
+        return "Each input must be a JSON object"
+    for key in REQUIRED_KEYS:
+        if key not in input_data:
+            return f"Missing required field: {key}"
+    for key in ['area', 'floors', 'approx_cost']:
+        try:
+            float(input_data[key])
+        except (TypeError, ValueError):
+            return f"Field '{key}' must be numeric"
+    for key in ['location', 'quality', 'construction_type']:
+        if not isinstance(input_data[key], str):
+            return f"Field '{key}' must be a string"
+    if input_data['quality'] not in encoder.categories['Quality']:
+        return f"Unknown quality: {input_data['quality']}"
+    if input_data['construction_type'] not in TYPE_MULTIPLIERS:
+        return f"Unknown construction_type: {input_data['construction_type']}"
+    return None
+
+
+def cache_key(input_data, model_version):
+    return (
+        model_version,
+        float(input_data['area']),
+        float(input_data['floors']),
+        input_data['location'],
+        input_data['quality'],
+        input_data['construction_type'],
+        float(input_data['approx_cost'])
+    )
+
+
+def predict_costs(inputs, cost_model):
+    """Price every input, serving repeats from the cache and the rest with a single model.predict call."""
+    keys = [cache_key(i, cost_model.version) for i in inputs]
+    results = [prediction_cache.get(key) for key in keys]
+    missing = [index for index, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+
+    # Identical inputs within one batch are only priced once
+    unique = list(dict.fromkeys(keys[index] for index in missing))
+    first_input = {}
+    for index in missing:
+        first_input.setdefault(keys[index], inputs[index])
+    pending = [first_input[key] for key in unique]
+
+    X = cost_model.encoder.transform(pending)
+    base_costs = cost_model.model.predict(X)
+
+    multipliers = np.array([TYPE_MULTIPLIERS[i['construction_type']] for i in pending])
+    final_costs = base_costs * multipliers * cost_model.encoder.location_factor(X)
+
+    priced = {}
+    for key, final_cost in zip(unique, final_costs.tolist()):
+        contributions = {head: (final_cost * (percentage / 100)) for head, percentage in PERCENTAGES.items()}
+        priced[key] = {
+            "predicted_cost": round(final_cost, 2),
+            "contributions": contributions,
+            "percentage_contributions": PERCENTAGES
+        }
+        prediction_cache.set(key, priced[key])
+
+    for index in missing:
+        results[index] = priced[keys[index]]
+    return results
+
 
 @cost_estimation_bp.route('/predict', methods=['POST'])
 def predict_cost():
-    if model is None:
-        return jsonify({"error": "Model not found. Ensure 'improved_construction_cost_model_v6.pkl' exists."}), 500
-
     try:
+        cost_model = current_cost_model()
+        if cost_model.model is None:
+            return jsonify({"error": "Model not found. Ensure 'improved_construction_cost_model_v6.pkl' exists."}), 500
+
         # Parse JSON input
         input_data = request.json
 
-        # Validate input fields
-        required_keys = ['area', 'floors', 'location', 'quality', 'construction_type', 'approx_cost']
-        for key in required_keys:
-            if key not in input_data:
-                return jsonify({"error": f"Missing required field: {key}"}), 400
-
-        # Map input data to match trained model's feature names
-        feature_mapping = {
-            'area': 'Area',
-            'floors': 'Floors',
-            'location': 'Location_Urban',
-            'quality': {
-                'Basic': 'Quality_Basic',
-                'Standard': 'Quality_Standard',
-                'Premium': 'Quality_Premium'
-            },
-            'construction_type': {
-                'Residential': 'Type_Residential',
-                'Commercial': 'Type_Commercial',
-                'Industrial': 'Type_Industrial'
-            },
-            'approx_cost': 'ApproxCost'
-        }
+        error = validate_input(input_data, cost_model.encoder)
+        if error:
+            return jsonify({"error": error}), 400
 
-        # Prepare the DataFrame
-        transformed_data = {
-            'Area': input_data['area'],
-            'Floors': input_data['floors'],
-            'ApproxCost': input_data['approx_cost']
-        }
+        return jsonify(predict_costs([input_data], cost_model)[0])
 
-        # Map categorical variables
-        transformed_data.update({
-            feature_mapping['location']: 1 if input_data['location'] == 'Urban' else 0,
-            feature_mapping['quality'][input_data['quality']]: 1,
-            feature_mapping['construction_type'][input_data['construction_type']]: 1
-        })
-
-        # Add interaction terms
-        transformed_data['Floors_Location_Urban'] = transformed_data['Floors'] * transformed_data.get('Location_Urban', 0)
-        transformed_data['Floors_Quality_Premium'] = transformed_data['Floors'] * transformed_data.get('Quality_Premium', 0)
-        transformed_data['Floors_Quality_Standard'] = transformed_data['Floors'] * transformed_data.get('Quality_Standard', 0)
-        transformed_data['Floors_Type_Commercial'] = transformed_data['Floors'] * transformed_data.get('Type_Commercial', 0)
-        transformed_data['Floors_Type_Industrial'] = transformed_data['Floors'] * transformed_data.get('Type_Industrial', 0)
-        transformed_data['Area_Floors'] = transformed_data['Area'] * transformed_data['Floors']
-        transformed_data['ApproxCost_Floors'] = transformed_data['ApproxCost'] * transformed_data['Floors']
-        transformed_data['Location_ApproxCost'] = transformed_data.get('Location_Urban', 0) * transformed_data['ApproxCost']
-        transformed_data['Location_Floors'] = transformed_data.get('Location_Urban', 0) * transformed_data['Floors']
-        transformed_data['Quality_Location_Urban'] = transformed_data.get('Quality_Premium', 0) * transformed_data.get('Location_Urban', 0)
-
-        # Adjust model for higher urban cost and floors
-        transformed_data['Location'] = 1.2 if transformed_data.get('Location_Urban', 0) == 1 else 1
-        transformed_data['Floors_Urban'] = transformed_data['Floors'] * transformed_data['Location']
-
-        # Create DataFrame
-        df = pd.DataFrame([transformed_data])
-
-        # Fill missing columns with zeros
-        model_features = model.feature_names_in_  # Get the feature names from the trained model
-        for col in model_features:
-            if col not in df.columns:
-                df[col] = 0
-
-        # Align DataFrame with model input
-        df = df[model_features]
-
-        # Predict base cost
-        base_cost = model.predict(df)[0]
-
-        # Apply multiplier based on construction type
-        construction_type = input_data['construction_type']
-        multiplier = 1.0  # Default multiplier for Residential
-
-        if construction_type == 'Industrial':
-            multiplier = 1.25
-        elif construction_type == 'Commercial':
-            multiplier = 1.5
-
-        final_cost = base_cost * multiplier * df['Location'].iloc[0]
-
-        # Calculate contributions based on specified percentages
-        percentages = {
-            'Cement': 13.0,
-            'Sand': 8.3,
-            'Aggregate': 5.6,
-            'Steel': 15.7,
-            'Paint': 2.8,
-            'Bricks': 6.5,
-            'Flooring': 4.6,
-            'Windows': 2.8,
-            'Doors': 3.7,
-            'Transportation Costs': 4.6,
-            'Architect & Design Costs': 6.5,
-            'Labor Costs': 21.3,
-            'Miscellaneous Costs': 4.6
-        }
+    except Exception as e:
+        print(f"Unexpected Error: {str(e)}")  # Log the unexpected error
+        return jsonify({"error": "An unexpected error occurred"}), 500
 
-        contributions = {key: (final_cost * (percentage / 100)) for key, percentage in percentages.items()}
 
-        return jsonify({
-            "predicted_cost": round(final_cost, 2),
-            "contributions": contributions,
-            "percentage_contributions": percentages
-        })
+@cost_estimation_bp.route('/predict/batch', methods=['POST'])
+def predict_cost_batch():
+    try:
+        cost_model = current_cost_model()
+        if cost_model.model is None:
+            return jsonify({"error": "Model not found. Ensure 'improved_construction_cost_model_v6.pkl' exists."}), 500
+
+        payload = request.json
+        inputs = payload.get('inputs') if isinstance(payload, dict) else payload
+        if not isinstance(inputs, list) or not inputs:
+            return jsonify({"error": "Provide a non-empty list of inputs"}), 400
+        if len(inputs) > MAX_BATCH_SIZE:
+            return jsonify({"error": f"At most {MAX_BATCH_SIZE} inputs are allowed per batch"}), 400
+
+        errors = [
+            {"index": index, "error": error}
+            for index, error in ((index, validate_input(item, cost_model.encoder)) for index, item in enumerate(inputs))
+            if error
+        ]
+        if errors:
+            return jsonify({"error": "Invalid inputs", "errors": errors}), 400
+
+        return jsonify({"results": predict_costs(inputs, cost_model)})
 
     except Exception as e:
         print(f"Unexpected Error: {str(e)}")  # Log the unexpected error
         return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@cost_estimation_bp.route('/predict/cache_stats', methods=['GET'])
+def prediction_cache_stats():
+    cost_model = model_registry.get('cost_model')
+    return jsonify({"model_version": cost_model.version, **prediction_cache.stats()})
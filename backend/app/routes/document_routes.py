@@ -1,12 +1,22 @@
 import os
 import json
 import logging
-from flask import Blueprint, request, jsonify
+import mimetypes
+from datetime import datetime
+from urllib.parse import quote
+from flask import Blueprint, current_app, request, jsonify
 import mysql.connector
 from mysql.connector import Error
 from flask_cors import CORS
+from ..db_pool import get_db_connection
+from ..streaming import iter_cursor, stream_json, stream_mode
+from ..chunked_upload import DEFAULT_MAX_CHUNK_SIZE, UploadError, UploadSessionStore
+from ..blob_store import BlobStore
+from ..previews import PreviewGenerator, can_preview
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename, send_file
 
-from flask import Blueprint, send_from_directory
+from flask import Blueprint
 
 # Use the blueprint for the route instead of app
 
@@ -25,61 +35,259 @@ if not os.path.exists(UPLOAD_FOLDER):
     logging.warning(f"Upload folder does not exist. Creating: {UPLOAD_FOLDER}")
     os.makedirs(UPLOAD_FOLDER)
 
+# Uploaded files are stored once per content hash; documents rows reference them by content_hash
+blob_store = BlobStore(os.path.join(UPLOAD_FOLDER, 'blobs'))
 
-def get_db_connection():
-    try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="construction_mgmt"
+# Downscaled previews keyed by content hash, rendered in the background after upload
+preview_generator = PreviewGenerator(os.path.join(UPLOAD_FOLDER, 'previews'))
+
+# Resumable uploads are assembled here before being moved into the blob store
+upload_sessions = UploadSessionStore(os.path.join(UPLOAD_FOLDER, '.partial'))
+
+MAX_PAGE_SIZE = 500
+DOCUMENT_COLUMNS = "id, document_name, file_path, file_name, file_size, content_hash, role, project_id, uploaded_at"
+# Blob URLs never change content, so browsers may keep them for a year
+BLOB_CACHE_MAX_AGE = 365 * 24 * 3600
+
+
+def send_document_file(file_path, download_name, etag=None, immutable=False):
+    """Send a stored file with validators, Range support and optional web server offload.
+
+    ``DOCUMENT_SENDFILE_MODE`` selects how the bytes are sent: unset streams
+    from Python, ``x-sendfile`` hands the path to Apache/lighttpd and
+    ``x-accel-redirect`` hands ``DOCUMENT_ACCEL_PREFIX`` + the path relative
+    to the upload folder to an nginx ``internal`` location. ``etag`` should be
+    the content hash when known; otherwise Werkzeug derives one from the file.
+    """
+    mode = current_app.config.get('DOCUMENT_SENDFILE_MODE')
+    if mode == 'x-accel-redirect':
+        relative = os.path.relpath(file_path, UPLOAD_FOLDER).replace(os.sep, '/')
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+        )
+        response.headers['X-Accel-Redirect'] = current_app.config.get('DOCUMENT_ACCEL_PREFIX', '/protected_uploads/') + relative
+        response.headers['Content-Disposition'] = f"inline; filename*=UTF-8''{quote(download_name)}"
+        response.set_etag(etag or f"{os.path.getmtime(file_path)}-{os.path.getsize(file_path)}")
+        response.last_modified = os.path.getmtime(file_path)
+        # nginx serves the body and any Range; only 304/412 are answered here
+        response.make_conditional(request, accept_ranges=False)
+    else:
+        response = send_file(
+            file_path,
+            request.environ,
+            download_name=download_name,
+            conditional=True,
+            etag=etag or True,
+            use_x_sendfile=mode == 'x-sendfile',
+            response_class=current_app.response_class
         )
-        if connection.is_connected():
-            return connection
-    except Error as e:
-        logging.error(f"Error while connecting to MySQL: {e}")
-        return None
-    
+
+    if immutable:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = BLOB_CACHE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        # The name may point at new content later; revalidating is a cheap 304
+        response.cache_control.no_cache = True
+    return response
+
+
+
+def send_stored_document(file_path, file_name, content_hash):
+    if file_path and blob_store.owns(file_path):
+        return send_document_file(file_path, file_name, etag=content_hash)
+
+    # Files uploaded before the blob store live directly in uploads_new
+    legacy_path = safe_join(UPLOAD_FOLDER, file_name)
+    if not legacy_path or not os.path.isfile(legacy_path):
+        raise FileNotFoundError(file_name)
+    return send_document_file(legacy_path, file_name, etag=content_hash)
+
+
+@document_bp.route('/uploads_new/<int:document_id>/file', methods=['GET'])
+def serve_document(document_id):
+    """A document's file by id; the ``url`` in listings points here or at ``/blobs``."""
+    conn = None
+    cursor = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT file_path, file_name, content_hash FROM documents WHERE id = %s", (document_id,))
+        document = cursor.fetchone()
+        if not document:
+            raise FileNotFoundError(document_id)
+        return send_stored_document(*document)
+    except Exception as e:
+        logging.error(f"Error serving document {document_id}: {e}")
+        return jsonify({'error': 'File not found'}), 404
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
 @document_bp.route('/uploads_new/<filename>', methods=['GET'])
 def serve_file(filename):
+    """Older links by file name. Names are no longer unique, so an ambiguous one is refused."""
+    conn = None
+    cursor = None
     try:
-        # Serve files from the uploads_new directory
-        return send_from_directory(
-            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads_new'),
-            filename,
-            as_attachment=False
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, file_path, content_hash FROM documents WHERE file_name = %s ORDER BY id DESC LIMIT 2",
+            (filename,)
         )
+        documents = cursor.fetchall()
+        if len(documents) > 1:
+            return jsonify({
+                'error': 'Several documents have this file name; open the document by its url',
+                'urls': [f"/uploads_new/{document[0]}/file" for document in documents]
+            }), 409
+        document = documents[0] if documents else (None, None, None)
+        return send_stored_document(document[1], filename, document[2])
     except Exception as e:
         logging.error(f"Error serving file {filename}: {e}")
         return jsonify({'error': 'File not found'}), 404
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
 
 
-def add_document(role, document_name, metadata):
+@document_bp.route('/blobs/<content_hash>', methods=['GET'])
+def serve_blob(content_hash):
+    """Serve a blob by content hash; ``?name=`` sets the download name. Cached as immutable."""
+    if len(content_hash) != 64 or not all(c in '0123456789abcdef' for c in content_hash):
+        return jsonify({'error': 'File not found'}), 404
+    file_path = blob_store.path(content_hash)
+    if not os.path.isfile(file_path):
+        return jsonify({'error': 'File not found'}), 404
+    name = secure_filename(request.args.get('name', '')) or content_hash
+    return send_document_file(file_path, name, etag=content_hash, immutable=True)
+
+
+@document_bp.route('/uploads_new/<int:document_id>/thumb', methods=['GET'])
+def serve_thumbnail(document_id):
+    """JPEG preview of an image or PDF document; 202 while it is still being rendered."""
+    conn = None
+    cursor = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        sql = "INSERT INTO documents (role, document_name, metadata) VALUES (%s, %s, %s)"
-        values = (role, document_name, json.dumps(metadata))  # Serialize metadata as JSON
+        cursor.execute("SELECT file_path, file_name, content_hash FROM documents WHERE id = %s", (document_id,))
+        document = cursor.fetchone()
+    except mysql.connector.Error as err:
+        logging.error(f"Database Error: {err}")
+        return jsonify({'error': 'Database error occurred'}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+    if not document:
+        return jsonify({'error': 'Document not found'}), 404
+    file_path, file_name, content_hash = document
+    if not file_path or not os.path.isfile(file_path):
+        return jsonify({'error': 'File not found'}), 404
+
+    preview_path, status = preview_generator.get(content_hash, file_path, file_name)
+    if status == 'pending':
+        response = jsonify({'status': 'pending'})
+        response.status_code = 202
+        response.headers['Retry-After'] = '1'
+        return response
+    if status == 'unavailable':
+        return jsonify({'error': 'No preview available'}), 404
+    thumb_name = f"{os.path.splitext(file_name)[0]}_thumb.jpg"
+    return send_document_file(preview_path, thumb_name, etag=f"{content_hash}-{preview_generator.size[0]}")
+
+@document_bp.route('/api/documents/previews/stats', methods=['GET'])
+def preview_stats():
+    return jsonify(preview_generator.stats())
+
+
+def add_document(role, document_name, file_name, temp_path, content_hash, file_size, project_id=None):
+    """Record a document and move its file from ``temp_path`` into the blob store.
+
+    The row is inserted before the blob is put in place and both happen in one
+    transaction, so a concurrent delete of the last document sharing the same
+    content (which locks that content_hash) cannot unlink the blob under us.
+    """
+    conn = None
+    cursor = None
+    try:
+        file_path = blob_store.path(content_hash)
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        conn.start_transaction()
+        sql = """
+            INSERT INTO documents (role, document_name, metadata, file_path, file_name, file_size,
+                                   content_hash, project_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        values = (
+            role,
+            document_name,
+            json.dumps({"file_path": file_path}),  # Kept for older readers of the metadata column
+            file_path,
+            file_name,
+            file_size,
+            content_hash,
+            project_id
+        )
         cursor.execute(sql, values)
+        blob_store.ingest(temp_path, content_hash)
         conn.commit()
         return cursor.lastrowid
-    except mysql.connector.Error as err:
-        logging.error(f"Database Error: {err}")
+    except Exception as err:
+        logging.error(f"Error adding document: {err}")
+        if conn:
+            conn.rollback()
+        blob_store.discard_temp(temp_path)
         raise
     finally:
-        cursor.close()
-        conn.close()
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
 
 def delete_document(document_id):
+    """Delete a document; its blob is unlinked only when no other document references it."""
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT metadata FROM documents WHERE id = %s", (document_id,))
+        conn.start_transaction()
+        cursor.execute("SELECT file_path, content_hash FROM documents WHERE id = %s FOR UPDATE", (document_id,))
         document = cursor.fetchone()
 
         if document:
-            file_path = json.loads(document[0])['file_path']
-            if os.path.exists(file_path):
+            file_path, content_hash = document
+            cursor.execute("DELETE FROM documents WHERE id = %s", (document_id,))
+            # Files are only touched once the row is gone for good
+            conn.commit()
+            logging.debug(f"Deleted document with ID: {document_id}")
+
+            if file_path and content_hash and blob_store.owns(file_path):
+                # Re-count in a new transaction: FOR UPDATE locks the content_hash index range,
+                # so an upload of the same content waits on its INSERT until the blob is gone
+                # and then stores it afresh
+                conn.start_transaction()
+                cursor.execute(
+                    "SELECT COUNT(*) FROM documents WHERE content_hash = %s FOR UPDATE", (content_hash,)
+                )
+                if cursor.fetchone()[0] == 0:
+                    blob_store.remove(content_hash)
+                    preview_generator.discard(content_hash)
+                else:
+                    logging.debug(f"Blob {content_hash} is still referenced, keeping it")
+                conn.commit()
+            elif file_path and os.path.exists(file_path):
+                # Files uploaded before the blob store each belong to a single document
                 try:
                     os.remove(file_path)
                     logging.debug(f"File deleted successfully from: {file_path}")
@@ -88,11 +296,8 @@ def delete_document(document_id):
                     raise
             else:
                 logging.warning(f"File does not exist: {file_path}")
-
-            cursor.execute("DELETE FROM documents WHERE id = %s", (document_id,))
-            conn.commit()
-            logging.debug(f"Deleted document with ID: {document_id}")
         else:
+            conn.rollback()
             logging.error(f"Document with ID {document_id} not found.")
         
         # Reset auto-increment if table is empty
@@ -104,6 +309,7 @@ def delete_document(document_id):
             logging.debug("Auto-increment counter reset.")
     except mysql.connector.Error as err:
         logging.error(f"Database Error: {err}")
+        conn.rollback()
         raise
     finally:
         cursor.close()
@@ -114,33 +320,140 @@ def upload_document():
     role = request.form.get('role')
     document_name = request.form.get('document')
     file = request.files.get('file')
+    project_id = request.form.get('project_id')
 
     if not role or not document_name or not file:
         logging.error("Missing required fields")
         return jsonify({'error': 'Missing required fields'}), 400
+    if project_id is not None and not project_id.isdigit():
+        return jsonify({'error': 'project_id must be an integer'}), 400
+
+    file_name = secure_filename(file.filename or '')
+    if not file_name:
+        return jsonify({'error': 'Invalid file name'}), 400
 
     try:
         logging.debug(f"Received file: {file.filename}")
-        file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-
-        # Check if file already exists
-        if os.path.exists(file_path):
-            logging.error(f"File already exists: {file_path}")
-            return jsonify({'error': 'File already exists'}), 400
-
-        # Save the file
-        file.save(file_path)
-        logging.info(f"File saved successfully to: {file_path}")
-
-        metadata = {"file_path": file_path}
-        document_id = add_document(role, document_name, metadata)
+        # Hashed while copying; identical content already in the store is not written twice
+        temp_path, content_hash, file_size = blob_store.write_temp(file.stream)
+        document_id = add_document(
+            role, document_name, file_name, temp_path, content_hash, file_size, int(project_id) if project_id else None
+        )
         logging.debug(f"Document added with ID: {document_id}")
+        preview_generator.submit(content_hash, blob_store.path(content_hash), file_name)
 
-        return jsonify({'id': document_id, 'file_name': file.filename}), 201
+        return jsonify({
+            'id': document_id,
+            'file_name': file_name,
+            'content_hash': content_hash,
+            'url': document_url(document_id, blob_store.path(content_hash), file_name, content_hash)
+        }), 201
     except Exception as e:
         logging.exception("Error uploading file")
         return jsonify({'error': 'File upload error occurred'}), 500
 
+def upload_error_response(err):
+    return jsonify(dict(err.details, error=err.message)), err.status
+
+@document_bp.route('/api/uploads', methods=['POST'])
+def start_chunked_upload():
+    """Start a resumable upload.
+
+    Body: ``{"role", "document", "file_name", "total_size", "project_id"?}``.
+    Chunks are then sent with ``PUT /api/uploads/<upload_id>?offset=N`` (raw
+    bytes as the body) and the upload is finished with ``POST .../complete``.
+    ``GET /api/uploads/<upload_id>`` reports the offset to resume from.
+    """
+    data = request.get_json(silent=True) or {}
+    file_name = secure_filename(data.get('file_name') or '')
+    if not data.get('role') or not data.get('document') or not file_name:
+        return jsonify({'error': 'Missing required fields'}), 400
+    project_id = data.get('project_id')
+    if project_id is not None and not isinstance(project_id, int):
+        return jsonify({'error': 'project_id must be an integer'}), 400
+    if not isinstance(data.get('total_size'), int):
+        return jsonify({'error': 'total_size must be an integer'}), 400
+
+    try:
+        upload_id = upload_sessions.create(
+            data['total_size'],
+            role=data['role'],
+            document_name=data['document'],
+            file_name=file_name,
+            project_id=project_id
+        )
+    except UploadError as err:
+        return upload_error_response(err)
+    return jsonify({
+        'upload_id': upload_id,
+        'received': 0,
+        'max_chunk_size': current_app.config.get('UPLOAD_MAX_CHUNK_SIZE', DEFAULT_MAX_CHUNK_SIZE)
+    }), 201
+
+@document_bp.route('/api/uploads/<upload_id>', methods=['GET'])
+def chunked_upload_status(upload_id):
+    try:
+        session = upload_sessions.get(upload_id)
+    except UploadError as err:
+        return upload_error_response(err)
+    return jsonify({key: session[key] for key in ('upload_id', 'file_name', 'received', 'total_size')})
+
+@document_bp.route('/api/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    try:
+        offset = int(request.args.get('offset', ''))
+    except ValueError:
+        return jsonify({'error': 'offset must be an integer'}), 400
+    try:
+        # request.stream is read incrementally; the chunk is never buffered whole
+        session = upload_sessions.append(upload_id, offset, request.stream)
+    except UploadError as err:
+        return upload_error_response(err)
+    except OSError:
+        logging.exception(f"Error writing chunk for upload {upload_id}")
+        return jsonify({'error': 'File upload error occurred'}), 500
+    return jsonify({'upload_id': upload_id, 'received': session['received'], 'total_size': session['total_size']})
+
+@document_bp.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    """Publish the assembled file and record the document.
+
+    An optional ``{"sha256": ...}`` body is checked against the hash computed while receiving.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        session = upload_sessions.get(upload_id)
+        temp_path = blob_store.temp_path()
+        content_hash = upload_sessions.complete(upload_id, temp_path, data.get('sha256'))
+    except UploadError as err:
+        return upload_error_response(err)
+
+    try:
+        document_id = add_document(
+            session['role'], session['document_name'], session['file_name'], temp_path, content_hash,
+            session['total_size'], session.get('project_id')
+        )
+    except Exception:
+        logging.exception("Error recording uploaded file")
+        return jsonify({'error': 'File upload error occurred'}), 500
+
+    logging.info(f"Chunked upload {upload_id} saved to: {blob_store.path(content_hash)}")
+    preview_generator.submit(content_hash, blob_store.path(content_hash), session['file_name'])
+    return jsonify({
+        'id': document_id,
+        'file_name': session['file_name'],
+        'content_hash': content_hash,
+        'url': document_url(document_id, blob_store.path(content_hash), session['file_name'], content_hash)
+    }), 201
+
+@document_bp.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def abort_chunked_upload(upload_id):
+    try:
+        upload_sessions.abort(upload_id)
+    except UploadError as err:
+        return upload_error_response(err)
+    return '', 204
+
 @document_bp.route('/api/delete/<int:document_id>', methods=['DELETE'])
 def delete_document_route(document_id):
     try:
@@ -150,26 +463,170 @@ def delete_document_route(document_id):
         logging.error(f"Error deleting document: {e}")
         return jsonify({'error': 'Document deletion error occurred'}), 500
 
+def document_url(document_id, file_path, file_name, content_hash):
+    if file_path and content_hash and blob_store.owns(file_path):
+        return f"/blobs/{content_hash}?name={quote(file_name or '')}"
+    return f"/uploads_new/{document_id}/file"
+
+def serialize_document(doc):
+    return {
+        'id': doc[0],
+        'document_name': doc[1],
+        'file_path': doc[2],
+        'file_name': doc[3],
+        'file_size': doc[4],
+        'content_hash': doc[5],
+        'role': doc[6],
+        'project_id': doc[7],
+        'uploaded_at': doc[8].isoformat() if doc[8] else None,
+        'url': document_url(doc[0], doc[2], doc[3], doc[5]),
+        'thumb_url': f"/uploads_new/{doc[0]}/thumb" if can_preview(doc[3]) else None
+    }
+
+def parse_datetime(value):
+    for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
 @document_bp.route('/api/documents', methods=['GET'])
 def get_documents():
+    """List documents.
+
+    Optional filters: ``role``, ``project_id``, ``uploaded_from``/``uploaded_to``
+    (``YYYY-MM-DD`` or ``YYYY-MM-DDTHH:MM:SS``). ``limit`` plus ``cursor`` (the
+    ``next_cursor`` of the previous page) switch to keyset pagination; without
+    them the full list is returned as a plain array.
+    """
+    conn = None
+    cursor = None
+    streaming = False
     try:
+        conditions = []
+        params = []
+        if request.args.get('role'):
+            conditions.append("role = %s")
+            params.append(request.args['role'])
+        if request.args.get('project_id'):
+            if not request.args['project_id'].isdigit():
+                return jsonify({'error': 'project_id must be an integer'}), 400
+            conditions.append("project_id = %s")
+            params.append(int(request.args['project_id']))
+        for arg, operator in (('uploaded_from', '>='), ('uploaded_to', '<=')):
+            if request.args.get(arg):
+                value = parse_datetime(request.args[arg])
+                if value is None:
+                    return jsonify({'error': f"Invalid {arg}, expected YYYY-MM-DD"}), 400
+                conditions.append(f"uploaded_at {operator} %s")
+                params.append(value)
+
+        paginated = 'limit' in request.args or 'cursor' in request.args
+        limit = None
+        if paginated:
+            try:
+                limit = min(max(int(request.args.get('limit', 50)), 1), MAX_PAGE_SIZE)
+                after = int(request.args.get('cursor', 0))
+            except ValueError:
+                return jsonify({'error': 'limit and cursor must be integers'}), 400
+            conditions.append("id > %s")
+            params.append(after)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT {DOCUMENT_COLUMNS} FROM documents{where} ORDER BY id"
+        if limit is not None:
+            # One extra row tells us whether there is a next page
+            query += " LIMIT %s"
+            params.append(limit + 1)
+
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT id, document_name, metadata FROM documents")
+        cursor.execute(query, tuple(params))
+
+        # ?stream=1 (JSON array) or ?stream=ndjson: rows are fetched and serialized incrementally
+        mode = stream_mode()
+        if mode and not paginated:
+            streaming = True
+            def close():
+                cursor.close()
+                conn.close()
+            return stream_json(iter_cursor(cursor), serialize_document, mode, on_close=close)
+
         documents = cursor.fetchall()
-        result = []
-        for doc in documents:
-            metadata = json.loads(doc[2])
-            result.append({
-                'id': doc[0],
-                'document_name': doc[1],
-                'file_path': metadata['file_path'],
-                'file_name': os.path.basename(metadata['file_path'])  # Extract file name from file path
-            })
-        return jsonify(result)
+        if not paginated:
+            return jsonify([serialize_document(doc) for doc in documents])
+
+        has_more = len(documents) > limit
+        result = [serialize_document(doc) for doc in documents[:limit]]
+        return jsonify({
+            'documents': result,
+            'next_cursor': result[-1]['id'] if has_more else None
+        })
     except mysql.connector.Error as err:
         logging.error(f"Database Error: {err}")
         return jsonify({'error': 'Database error occurred'}), 500
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        if not streaming:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+@document_bp.route('/api/documents/usage', methods=['GET'])
+def documents_usage():
+    """Disk usage grouped by ``?group_by=role`` (default) or ``project_id``.
+
+    ``logical_bytes`` counts every document; ``stored_bytes`` counts each
+    distinct blob once within the group, which is what the group costs on
+    disk. The overall total is deduplicated across groups.
+    """
+    group_by = request.args.get('group_by', 'role')
+    if group_by not in ('role', 'project_id'):
+        return jsonify({'error': 'group_by must be role or project_id'}), 400
+
+    conn = None
+    cursor = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {group_by}, COUNT(*), COALESCE(SUM(file_size), 0), COUNT(DISTINCT content_hash)
+            FROM documents
+            GROUP BY {group_by}
+        """)
+        groups = {
+            key: {group_by: key, 'documents': count, 'logical_bytes': int(logical), 'blobs': blobs, 'stored_bytes': 0}
+            for key, count, logical, blobs in cursor.fetchall()
+        }
+        cursor.execute(f"""
+            SELECT {group_by}, COALESCE(SUM(file_size), 0)
+            FROM (SELECT DISTINCT {group_by}, content_hash, file_size FROM documents) AS blobs
+            GROUP BY {group_by}
+        """)
+        for key, stored in cursor.fetchall():
+            groups[key]['stored_bytes'] = int(stored)
+
+        cursor.execute("""
+            SELECT COUNT(content_hash), COALESCE(SUM(file_size), 0)
+            FROM (SELECT content_hash, MAX(file_size) AS file_size FROM documents GROUP BY content_hash) AS blobs
+        """)
+        blobs, stored = cursor.fetchone()
+        return jsonify({
+            'group_by': group_by,
+            'groups': list(groups.values()),
+            'total': {
+                'documents': sum(group['documents'] for group in groups.values()),
+                'logical_bytes': sum(group['logical_bytes'] for group in groups.values()),
+                'blobs': blobs,
+                'stored_bytes': int(stored)
+            }
+        })
+    except mysql.connector.Error as err:
+        logging.error(f"Database Error: {err}")
+        return jsonify({'error': 'Database error occurred'}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
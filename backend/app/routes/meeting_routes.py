@@ -1,12 +1,91 @@
 from flask import Blueprint, request, jsonify
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, or_, tuple_
+from sqlalchemy.orm import selectinload
 from ..models import db, Meeting, Notification
+from ..streaming import FETCH_BATCH_SIZE, stream_json, stream_mode
+from ..notification_outbox import PENDING, notification_outbox
+from ..query_budget import query_budget
+from ..meeting_conflicts import find_conflicts
 
 # Define Blueprint
 meeting_bp = Blueprint("meeting_bp", __name__)
 
+MAX_PAGE_SIZE = 200
+CALENDAR_FILTERS = ("client_name", "status", "location")
+DEFAULT_DURATION_MINUTES = 60
+# Capping the length lets overlap queries scan a bounded date_time range
+MAX_DURATION_MINUTES = 24 * 60
+MAX_CONFLICT_WINDOW_DAYS = 366
+# Meetings with these statuses never conflict with anything
+INACTIVE_STATUSES = ("Cancelled",)
+
+
+def parse_calendar_time(value, end=False):
+    """Parse ``YYYY-MM-DD`` or ``YYYY-MM-DDTHH:MM``; a bare end date covers that whole day."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M")
+    except ValueError:
+        pass
+    try:
+        day = datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return None
+    return day + timedelta(days=1) if end else day
+
+def parse_duration(data, default):
+    """Meeting length in minutes from the request body, or None if it is invalid."""
+    duration = data.get("duration_minutes", default)
+    if not isinstance(duration, int) or not 0 < duration <= MAX_DURATION_MINUTES:
+        return None
+    return duration
+
+def find_overlapping_meetings(start, end, client_name, location, exclude_id=None):
+    """Active meetings overlapping [start, end) for the same client or at the same location.
+
+    ``date_time`` is bounded on both sides (a meeting cannot start more than
+    MAX_DURATION_MINUTES before it ends), so each branch is a range scan on
+    the (client_name, date_time) or (location, date_time) index.
+    """
+    window = and_(
+        Meeting.date_time > start - timedelta(minutes=MAX_DURATION_MINUTES),
+        Meeting.date_time < end,
+        Meeting.end_time > start
+    )
+    query = db.session.query(
+        Meeting.id, Meeting.meeting_topic, Meeting.client_name, Meeting.location, Meeting.date_time, Meeting.end_time
+    ).filter(
+        or_(and_(Meeting.client_name == client_name, window), and_(Meeting.location == location, window)),
+        Meeting.status.notin_(INACTIVE_STATUSES)
+    )
+    if exclude_id is not None:
+        query = query.filter(Meeting.id != exclude_id)
+    return query.order_by(Meeting.date_time).all()
+
+def conflict_response(conflicts, client_name, location):
+    return jsonify({
+        "error": "Meeting overlaps existing meetings",
+        "conflicts": [
+            {
+                "id": c.id,
+                "meeting_topic": c.meeting_topic,
+                "conflict_on": "client_name" if c.client_name == client_name else "location",
+                "date_time": c.date_time.isoformat(),
+                "end_time": c.end_time.isoformat()
+            }
+            for c in conflicts
+        ]
+    }), 409
+
+def parse_limit(default=50):
+    try:
+        return min(max(int(request.args.get("limit", default)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return None
+
 # API to Create a Meeting
 @meeting_bp.route("/meetings", methods=["POST"])
+@query_budget(3)
 def create_meeting():
     data = request.json
     
@@ -14,57 +93,210 @@ def create_meeting():
         meeting_date_time = datetime.strptime(data["date_time"], "%Y-%m-%dT%H:%M")
     except ValueError:
         return jsonify({"error": "Invalid date format. Please use 'YYYY-MM-DDTHH:MM'"}), 400
+    duration = parse_duration(data, DEFAULT_DURATION_MINUTES)
+    if duration is None:
+        return jsonify({"error": f"duration_minutes must be between 1 and {MAX_DURATION_MINUTES}"}), 400
+    end_time = meeting_date_time + timedelta(minutes=duration)
+
+    # "allow_conflicts": true books the meeting anyway
+    status = data.get("status", "Scheduled")
+    if status not in INACTIVE_STATUSES and not data.get("allow_conflicts"):
+        conflicts = find_overlapping_meetings(meeting_date_time, end_time, data["client_name"], data["location"])
+        if conflicts:
+            return conflict_response(conflicts, data["client_name"], data["location"])
 
     new_meeting = Meeting(
         meeting_topic=data["meeting_topic"],
         place=data["place"],
         location=data["location"],
         date_time=meeting_date_time,
+        duration_minutes=duration,
+        end_time=end_time,
         client_name=data["client_name"],
-        status=data.get("status", "Scheduled"),
+        status=status,
         agenda=data["agenda"],
         notes=data.get("notes", "")
     )
     db.session.add(new_meeting)
-    db.session.commit()
+    db.session.flush()  # Assigns new_meeting.id without committing
 
-    # Create Notification for the Meeting
+    # The reminder is queued in the same transaction; the outbox workers deliver it
     notification = Notification(
         meeting_id=new_meeting.id,
         notification_type="Reminder",
         recipient=data["client_name"],
         message=f"Reminder: {new_meeting.meeting_topic} is scheduled at {new_meeting.place}.",
-        sent_at=datetime.utcnow(),
-        status="Sent"
+        status=PENDING,
+        next_attempt_at=datetime.utcnow()
     )
     db.session.add(notification)
     db.session.commit()
+    notification_outbox.wake()
+
+    return jsonify({"message": "Meeting Scheduled & Notification Queued"}), 201
+
+def serialize_meeting(m, include_notifications=False):
+    meeting = {
+        "id": m.id,
+        "meeting_topic": m.meeting_topic,
+        "place": m.place,
+        "location": m.location,
+        "date_time": m.date_time.isoformat(),
+        "duration_minutes": m.duration_minutes,
+        "end_time": m.end_time.isoformat() if m.end_time else None,
+        "client_name": m.client_name,
+        "status": m.status,
+        "agenda": m.agenda,
+        "notes": m.notes
+    }
+    if include_notifications:
+        meeting["notifications"] = [
+            {"id": n.id, "notification_type": n.notification_type, "status": n.status} for n in m.notifications
+        ]
+    return meeting
 
-    return jsonify({"message": "Meeting Scheduled & Notification Created"}), 201
+def serialize_notification(n):
+    return {
+        "id": n.id,
+        "notification_type": n.notification_type,
+        "recipient": n.recipient,
+        "message": n.message,
+        "sent_at": n.sent_at.strftime("%Y-%m-%d %H:%M") if n.sent_at else None,
+        "status": n.status,
+        "meeting_date": n.date_time.strftime("%Y-%m-%d"),
+        "meeting_time": n.date_time.strftime("%H:%M")
+    }
 
 # API to Get All Meetings
 @meeting_bp.route("/meetings", methods=["GET"])
+@query_budget(2)
 def get_meetings():
-    meetings = Meeting.query.all()
-    return jsonify([
-        {
-            "id": m.id,
-            "meeting_topic": m.meeting_topic,
-            "place": m.place,
-            "location": m.location,
-            "date_time": m.date_time.isoformat(),
-            "client_name": m.client_name,
-            "status": m.status,
-            "agenda": m.agenda,
-            "notes": m.notes
-        }
-        for m in meetings
-    ])
+    query = Meeting.query.order_by(Meeting.id)
+
+    # ?stream=1 (JSON array) or ?stream=ndjson: rows are loaded in batches and serialized incrementally
+    mode = stream_mode()
+    if mode:
+        return stream_json(query.yield_per(FETCH_BATCH_SIZE), serialize_meeting, mode)
+
+    # ?include=notifications loads them for all meetings in one extra query instead of one per meeting
+    include_notifications = request.args.get("include") == "notifications"
+    if include_notifications:
+        query = query.options(selectinload(Meeting.notifications))
+
+    meetings = query.all()
+    return jsonify([serialize_meeting(m, include_notifications) for m in meetings])
+
+# API to Query the Meeting Calendar
+@meeting_bp.route("/meetings/calendar", methods=["GET"])
+@query_budget(1)
+def get_meeting_calendar():
+    """Meetings ordered by date_time, filtered and paginated in the database.
+
+    Query parameters: ``start`` (inclusive) and ``end`` (exclusive; a bare
+    date includes that day), ``client_name``, ``status``, ``location``,
+    ``limit`` and ``cursor`` (the ``next_cursor`` of the previous page).
+    Every filter combination is served by a (column, date_time) index range.
+    """
+    query = Meeting.query
+    for arg, end in (("start", False), ("end", True)):
+        if request.args.get(arg):
+            value = parse_calendar_time(request.args[arg], end=end)
+            if value is None:
+                return jsonify({"error": f"Invalid {arg}. Please use 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM'"}), 400
+            query = query.filter(Meeting.date_time >= value if not end else Meeting.date_time < value)
+    for column in CALENDAR_FILTERS:
+        if request.args.get(column):
+            query = query.filter(getattr(Meeting, column) == request.args[column])
+
+    limit = parse_limit()
+    if limit is None:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if request.args.get("cursor"):
+        try:
+            cursor_time, cursor_id = request.args["cursor"].rsplit("_", 1)
+            after = (datetime.fromisoformat(cursor_time), int(cursor_id))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        # Keyset on (date_time, id): resumes exactly after the last row of the previous page
+        query = query.filter(tuple_(Meeting.date_time, Meeting.id) > after)
+
+    # One extra row tells us whether there is a next page
+    meetings = query.order_by(Meeting.date_time, Meeting.id).limit(limit + 1).all()
+    has_more = len(meetings) > limit
+    meetings = meetings[:limit]
+    last = meetings[-1] if meetings else None
+    return jsonify({
+        "meetings": [serialize_meeting(m) for m in meetings],
+        "next_cursor": f"{last.date_time.isoformat()}_{last.id}" if has_more else None
+    })
+
+# API to Get Upcoming Meetings
+@meeting_bp.route("/meetings/upcoming", methods=["GET"])
+@query_budget(1)
+def get_upcoming_meetings():
+    """The next ``limit`` meetings from now, ``Scheduled`` only unless ``?status=`` says otherwise.
+
+    ``?status=all`` drops the status filter. ``days`` bounds how far ahead to look.
+    """
+    status = request.args.get("status", "Scheduled")
+    limit = parse_limit(default=10)
+    if limit is None:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    now = datetime.now()
+    query = Meeting.query.filter(Meeting.date_time >= now)
+    if status != "all":
+        query = query.filter(Meeting.status == status)
+    if request.args.get("days"):
+        try:
+            query = query.filter(Meeting.date_time < now + timedelta(days=int(request.args["days"])))
+        except ValueError:
+            return jsonify({"error": "days must be an integer"}), 400
+
+    meetings = query.order_by(Meeting.date_time, Meeting.id).limit(limit).all()
+    return jsonify([serialize_meeting(m) for m in meetings])
+
+# API to Find Double Bookings
+@meeting_bp.route("/meetings/conflicts", methods=["GET"])
+@query_budget(1)
+def get_meeting_conflicts():
+    """All overlapping pairs of active meetings in a window, by shared client and/or location.
+
+    ``start``/``end`` as for the calendar (default: the next 30 days), ``by``
+    is ``client_name``, ``location`` or ``both`` (default). The meetings are
+    read in one indexed range query and compared with a sweep per client or
+    location, O(n log n) plus the number of conflicts found.
+    """
+    start = parse_calendar_time(request.args["start"]) if request.args.get("start") else datetime.now()
+    end = parse_calendar_time(request.args["end"], end=True) if request.args.get("end") else start + timedelta(days=30)
+    if start is None or end is None:
+        return jsonify({"error": "Invalid date format. Please use 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM'"}), 400
+    if end <= start or end - start > timedelta(days=MAX_CONFLICT_WINDOW_DAYS):
+        return jsonify({"error": f"end must be after start and at most {MAX_CONFLICT_WINDOW_DAYS} days later"}), 400
+    by = request.args.get("by", "both")
+    keys = {"client_name": ("client_name",), "location": ("location",), "both": ("client_name", "location")}.get(by)
+    if keys is None:
+        return jsonify({"error": "by must be client_name, location or both"}), 400
+
+    meetings = db.session.query(
+        Meeting.id, Meeting.client_name, Meeting.location, Meeting.date_time, Meeting.end_time
+    ).filter(
+        Meeting.date_time > start - timedelta(minutes=MAX_DURATION_MINUTES),
+        Meeting.date_time < end,
+        Meeting.end_time > start,
+        Meeting.status.notin_(INACTIVE_STATUSES)
+    ).all()
+
+    conflicts = find_conflicts(meetings, keys)
+    return jsonify({"start": start.isoformat(), "end": end.isoformat(), "meetings_checked": len(meetings),
+                    "conflicts": conflicts})
 
 # API to Get All Notifications
 @meeting_bp.route("/notifications", methods=["GET"])
+@query_budget(1)
 def get_notifications():
-    notifications = Notification.query.join(Meeting).add_columns(
+    # Plain column rows: no Notification entities are built, identity-mapped or expired
+    query = db.session.query(
         Notification.id,
         Notification.notification_type,
         Notification.recipient,
@@ -72,41 +304,51 @@ def get_notifications():
         Notification.sent_at,
         Notification.status,
         Meeting.date_time
-    ).all()
+    ).join(Meeting, Notification.meeting_id == Meeting.id)
+
+    mode = stream_mode()
+    if mode:
+        return stream_json(query.yield_per(FETCH_BATCH_SIZE), serialize_notification, mode)
 
-    return jsonify([
-        {
-            "id": n.id,
-            "notification_type": n.notification_type,
-            "recipient": n.recipient,
-            "message": n.message,
-            "sent_at": n.sent_at.strftime("%Y-%m-%d %H:%M"),
-            "status": n.status,
-            "meeting_date": n.date_time.strftime("%Y-%m-%d"),
-            "meeting_time": n.date_time.strftime("%H:%M")
-        }
-        for n in notifications
-    ])
+    notifications = query.all()
+    return jsonify([serialize_notification(n) for n in notifications])
 
 # API to Update a Meeting
 @meeting_bp.route("/meetings/<int:meeting_id>", methods=["PUT"])
+@query_budget(3)
 def update_meeting(meeting_id):
     data = request.json
-    meeting = Meeting.query.get(meeting_id)
+    meeting = db.session.get(Meeting, meeting_id)
 
     if not meeting:
         return jsonify({"error": "Meeting not found"}), 404
 
     try:
-        meeting.date_time = datetime.strptime(data["date_time"], "%Y-%m-%dT%H:%M")
+        meeting_date_time = datetime.strptime(data["date_time"], "%Y-%m-%dT%H:%M")
     except ValueError:
         return jsonify({"error": "Invalid date format. Please use 'YYYY-MM-DDTHH:MM'"}), 400
+    duration = parse_duration(data, meeting.duration_minutes or DEFAULT_DURATION_MINUTES)
+    if duration is None:
+        return jsonify({"error": f"duration_minutes must be between 1 and {MAX_DURATION_MINUTES}"}), 400
+    end_time = meeting_date_time + timedelta(minutes=duration)
+
+    status = data.get("status", meeting.status)
+    if status not in INACTIVE_STATUSES and not data.get("allow_conflicts"):
+        conflicts = find_overlapping_meetings(
+            meeting_date_time, end_time, data["client_name"], data["location"], exclude_id=meeting_id
+        )
+        if conflicts:
+            return conflict_response(conflicts, data["client_name"], data["location"])
+
+    meeting.date_time = meeting_date_time
+    meeting.duration_minutes = duration
+    meeting.end_time = end_time
 
     meeting.meeting_topic = data["meeting_topic"]
     meeting.place = data["place"]
     meeting.location = data["location"]
     meeting.client_name = data["client_name"]
-    meeting.status = data.get("status", meeting.status)
+    meeting.status = status
     meeting.agenda = data["agenda"]
     meeting.notes = data.get("notes", "")
 
@@ -116,13 +358,13 @@ def update_meeting(meeting_id):
 
 # API to Delete a Meeting
 @meeting_bp.route("/meetings/<int:meeting_id>", methods=["DELETE"])
+@query_budget(1)
 def delete_meeting(meeting_id):
-    meeting = Meeting.query.get(meeting_id)
-    if not meeting:
+    # One statement; the notification foreign key cascades the delete in the database
+    result = db.session.execute(delete(Meeting).where(Meeting.id == meeting_id))
+    if result.rowcount == 0:
+        db.session.rollback()
         return jsonify({"error": "Meeting not found"}), 404
-
-    Notification.query.filter_by(meeting_id=meeting_id).delete()
-    db.session.delete(meeting)
     db.session.commit()
     
     return jsonify({"message": "Meeting deleted successfully"}), 200
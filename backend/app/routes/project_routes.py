@@ -1,46 +1,146 @@
 from flask import Blueprint, request, jsonify
-import mysql.connector
 from mysql.connector import Error
 from flask_cors import CORS
-from datetime import datetime
+from datetime import date, datetime, timedelta
+import csv
+import io
+import os
+import threading
+import uuid
+from ..db_pool import get_db_connection
+from ..prediction_cache import LRUCache
+from ..scheduler import ProjectSchedule, ScheduleCycleError
+from ..streaming import iter_cursor, stream_json, stream_mode
 
 project_bp = Blueprint('project', __name__)
 CORS(project_bp)
 
-def get_db_connection():
+# Columns the list endpoint can return; dates are formatted by MySQL
+PROJECT_LIST_FIELDS = {
+    'project_id': "project_id",
+    'project_name': "project_name",
+    'location': "location",
+    'project_type': "project_type",
+    'sponsor': "sponsor",
+    'budget': "budget",
+    'project_area': "project_area",
+    'start_date': "DATE_FORMAT(start_date, '%Y-%m-%d')",
+    'end_date': "DATE_FORMAT(end_date, '%Y-%m-%d')"
+}
+DEFAULT_PROJECT_LIST_FIELDS = ['project_id', 'project_name', 'location', 'start_date', 'end_date']
+MAX_PAGE_SIZE = 500
+MAX_PORTFOLIO_IDS = 1000
+PROJECT_IMPORT_FIELDS = ['project_name', 'location', 'project_type', 'sponsor',
+                         'budget', 'project_area', 'start_date', 'end_date']
+MAX_IMPORT_ROWS = 50000
+# Rows per multi-row INSERT, keeps each statement well under max_allowed_packet
+IMPORT_BATCH_SIZE = 1000
+# Built schedules per project. Writes through this blueprint invalidate or update them in place;
+# the TTL bounds how long changes made by other worker processes can go unseen
+schedule_cache = LRUCache(
+    maxsize=int(os.environ.get("SCHEDULE_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("SCHEDULE_CACHE_TTL", 60))
+)
+schedule_cache_lock = threading.Lock()
+# Bumped under schedule_cache_lock after every committed task write, one int per project. A schedule
+# is only cached if its project's generation has not moved since its rows were read
+schedule_generation = {}
+
+
+def parse_date(date_str):
+    if not date_str:
+        return None
     try:
-        return mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="construction_mgmt"
-        )
-    except Error as e:
-        print(f"Database connection error: {e}")
-        raise
+        return datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
 
 @project_bp.route('/projects_list', methods=['GET'])
 def projects_list():
+    """List projects.
+
+    Optional query parameters: ``location``, ``project_type``, ``start_from``/``start_to``
+    (start date range), ``fields`` (comma separated), and for keyset pagination
+    ``limit`` plus ``cursor`` (the ``next_cursor`` of the previous page) and ``include_total``.
+    Without ``limit``/``cursor`` the full list is returned as a plain array.
+    """
     conn = None
     cursor = None
     try:
+        fields = request.args.get('fields')
+        fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else list(DEFAULT_PROJECT_LIST_FIELDS)
+        unknown = [f for f in fields if f not in PROJECT_LIST_FIELDS]
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+        if 'project_id' not in fields:
+            fields.insert(0, 'project_id')
+
+        conditions = []
+        params = []
+        for column in ('location', 'project_type'):
+            value = request.args.get(column)
+            if value:
+                conditions.append(f"{column} = %s")
+                params.append(value)
+        for arg, operator in (('start_from', '>='), ('start_to', '<=')):
+            if request.args.get(arg):
+                value = parse_date(request.args.get(arg))
+                if value is None:
+                    return jsonify({"error": f"Invalid {arg}, expected YYYY-MM-DD"}), 400
+                conditions.append(f"start_date {operator} %s")
+                params.append(value)
+
+        paginated = 'limit' in request.args or 'cursor' in request.args
+        page_conditions = list(conditions)
+        page_params = list(params)
+        limit = None
+        if paginated:
+            try:
+                limit = min(max(int(request.args.get('limit', 50)), 1), MAX_PAGE_SIZE)
+                after = int(request.args.get('cursor', 0))
+            except ValueError:
+                return jsonify({"error": "limit and cursor must be integers"}), 400
+            page_conditions.append("project_id > %s")
+            page_params.append(after)
+
+        where = f" WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+        query = f"SELECT {', '.join(PROJECT_LIST_FIELDS[f] for f in fields)} FROM projects{where} ORDER BY project_id"
+        if limit is not None:
+            # One extra row tells us whether there is a next page
+            query += " LIMIT %s"
+            page_params.append(limit + 1)
+
         conn = get_db_connection()
         cursor = conn.cursor()
-        query = "SELECT project_id, project_name, location, start_date, end_date FROM projects"
-        cursor.execute(query)
+        cursor.execute(query, tuple(page_params))
         projects = cursor.fetchall()
 
-        project_list = [
-            {
-                "project_id": project[0],
-                "project_name": project[1].title() if project[1] else "", 
-                "location": project[2].capitalize() if project[2] else "",
-                "start_date": project[3].strftime('%Y-%m-%d') if project[3] else None,
-                "end_date": project[4].strftime('%Y-%m-%d') if project[4] else None
-            }
-            for project in projects
-        ]
-        return jsonify(project_list)
+        has_more = limit is not None and len(projects) > limit
+        if has_more:
+            projects = projects[:limit]
+
+        project_list = []
+        for project in projects:
+            row = dict(zip(fields, project))
+            if 'project_name' in row:
+                row['project_name'] = row['project_name'].title() if row['project_name'] else ""
+            if 'location' in row:
+                row['location'] = row['location'].capitalize() if row['location'] else ""
+            project_list.append(row)
+
+        if not paginated:
+            return jsonify(project_list)
+
+        response = {
+            "projects": project_list,
+            "next_cursor": project_list[-1]['project_id'] if has_more else None
+        }
+        if request.args.get('include_total') in ('1', 'true'):
+            count_where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+            cursor.execute(f"SELECT COUNT(*) FROM projects{count_where}", tuple(params))
+            response["total"] = cursor.fetchone()[0]
+        return jsonify(response)
     except Error as e:
         return jsonify({"error": str(e)}), 500
     finally:
@@ -93,14 +193,6 @@ def update_project(project_id):
         if not project_data:
             return jsonify({"message": "No data provided"}), 400
 
-        def parse_date(date_str):
-            if not date_str:
-                return None
-            try:
-                return datetime.strptime(date_str, '%Y-%m-%d').date()
-            except ValueError:
-                return None
-
         start_date = parse_date(project_data.get('start_date'))
         end_date = parse_date(project_data.get('end_date'))
 
@@ -202,6 +294,121 @@ def add_project():
         if conn:
             conn.close()
 
+def read_import_rows():
+    """Project rows from a CSV upload (``file`` field or a ``text/csv`` body) or a JSON array."""
+    upload = request.files.get('file')
+    if upload:
+        return list(csv.DictReader(io.TextIOWrapper(upload.stream, encoding='utf-8-sig')))
+    if request.mimetype == 'text/csv':
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('projects')
+    return data if isinstance(data, list) else None
+
+def validate_project_row(row):
+    """``(values, None)`` ready for the INSERT, or ``(None, error)``."""
+    if not isinstance(row, dict):
+        return None, "Row must be an object"
+    missing = [field for field in PROJECT_IMPORT_FIELDS if row.get(field) in (None, '')]
+    if missing:
+        return None, f"Missing required fields: {', '.join(missing)}"
+    try:
+        budget = float(row['budget'])
+        project_area = float(row['project_area'])
+    except (TypeError, ValueError):
+        return None, "budget and project_area must be numbers"
+    start_date = parse_date(str(row['start_date']))
+    end_date = parse_date(str(row['end_date']))
+    if not start_date or not end_date:
+        return None, "Dates must be YYYY-MM-DD"
+    if end_date < start_date:
+        return None, "end_date is before start_date"
+    return (row['project_name'], row['location'], row['project_type'], row['sponsor'],
+            budget, project_area, start_date, end_date), None
+
+@project_bp.route('/projects/import', methods=['POST'])
+def import_projects():
+    """Import many projects, with their template tasks, in one transaction.
+
+    Accepts a JSON array (or ``{"projects": [...]}``) or CSV with a header row
+    naming the ``add_project`` fields. Invalid rows are skipped and reported;
+    every row gets a result with its ``index`` and either ``project_id`` or
+    ``error``. With ``?stream=ndjson`` (or ``json``) the results are streamed.
+    """
+    conn = None
+    cursor = None
+    try:
+        rows = read_import_rows()
+        if rows is None:
+            return jsonify({"message": "Expected a JSON array or CSV upload"}), 400
+        if not rows:
+            return jsonify({"message": "No data provided"}), 400
+        if len(rows) > MAX_IMPORT_ROWS:
+            return jsonify({"message": f"At most {MAX_IMPORT_ROWS} projects are allowed per import"}), 400
+
+        results = []
+        valid = []
+        for index, row in enumerate(rows):
+            values, error = validate_project_row(row)
+            if error:
+                results.append({"index": index, "error": error})
+            else:
+                results.append({"index": index})
+                valid.append((index, values))
+
+        if valid:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            conn.start_transaction()
+
+            # Auto-increment ids of a multi-row INSERT are not guaranteed consecutive when other
+            # inserts run concurrently, so rows are tagged with this import and read back by it
+            import_batch = uuid.uuid4().hex
+            for start in range(0, len(valid), IMPORT_BATCH_SIZE):
+                batch = valid[start:start + IMPORT_BATCH_SIZE]
+                # executemany sends one multi-row INSERT
+                cursor.executemany("""
+                    INSERT INTO projects (project_name, location, project_type, sponsor, budget,
+                                        project_area, start_date, end_date, import_batch, import_row)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, [values + (import_batch, index) for index, values in batch])
+
+            cursor.execute(
+                "SELECT project_id, import_row FROM projects WHERE import_batch = %s", (import_batch,)
+            )
+            for project_id, index in cursor.fetchall():
+                results[index]["project_id"] = project_id
+
+            # Template tasks for every new project in a single INSERT ... SELECT
+            cursor.execute("""
+                INSERT INTO tasks (project_id, task_name, phase)
+                SELECT p.project_id, t.task_name, t.phase
+                FROM projects p CROSS JOIN task_templates t
+                WHERE p.import_batch = %s
+            """, (import_batch,))
+            conn.commit()
+
+        mode = stream_mode()
+        if mode:
+            return stream_json(results, lambda result: result, mode)
+
+        return jsonify({
+            "message": "Projects imported successfully!" if valid else "No valid projects to import",
+            "imported": len(valid),
+            "failed": len(rows) - len(valid),
+            "results": results
+        }), 201 if valid else 400
+    except Error as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"message": "Error importing projects", "error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
 @project_bp.route('/delete_task/<int:task_id>', methods=['DELETE'])
 def delete_task(task_id):
     conn = None
@@ -209,11 +416,19 @@ def delete_task(task_id):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        conn.start_transaction()
+        cursor.execute("SELECT project_id FROM tasks WHERE task_id = %s FOR UPDATE", (task_id,))
+        task = cursor.fetchone()
+        if not task:
+            conn.rollback()
+            return jsonify({"message": "Task not found"}), 404
+
         cursor.execute("DELETE FROM tasks WHERE task_id = %s", (task_id,))
+        cursor.execute(
+            "DELETE FROM task_dependencies WHERE task_id = %s OR depends_on_task_id = %s", (task_id, task_id)
+        )
         conn.commit()
-
-        if cursor.rowcount == 0:
-            return jsonify({"message": "Task not found"}), 404
+        invalidate_schedule(task[0])
 
         return jsonify({"message": "Task deleted successfully!"}), 200
     except Error as e:
@@ -230,10 +445,21 @@ def delete_task(task_id):
 def get_project_tasks(project_id):
     conn = None
     cursor = None
+    streaming = False
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM tasks WHERE project_id = %s", (project_id,))
+
+        # ?stream=1 (JSON array) or ?stream=ndjson: an empty project streams an empty result instead of a 404
+        mode = stream_mode()
+        if mode:
+            streaming = True
+            def close():
+                cursor.close()
+                conn.close()
+            return stream_json(iter_cursor(cursor), dict, mode, on_close=close)
+
         tasks = cursor.fetchall()
         
         if not tasks:
@@ -243,10 +469,11 @@ def get_project_tasks(project_id):
     except Error as e:
         return jsonify({"message": "Error fetching tasks", "error": str(e)}), 500
     finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        if not streaming:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
 
 @project_bp.route('/delete_project/<int:project_id>', methods=['DELETE'])
 def delete_project(project_id):
@@ -254,9 +481,11 @@ def delete_project(project_id):
     try:
         conn = get_db_connection()
         with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM task_dependencies WHERE project_id = %s", (project_id,))
             cursor.execute("DELETE FROM tasks WHERE project_id = %s", (project_id,))
             cursor.execute("DELETE FROM projects WHERE project_id = %s", (project_id,))
             conn.commit()
+            invalidate_schedule(project_id)
 
             if cursor.rowcount == 0:
                 return jsonify({"message": "Project not found"}), 404
@@ -271,6 +500,9 @@ def delete_project(project_id):
         if conn:
             conn.close()
 
+def completion_percentage(completed_tasks, total_tasks):
+    return round((completed_tasks / total_tasks) * 100, 2) if total_tasks > 0 else 0.0
+
 @project_bp.route('/project_status/<int:project_id>', methods=['GET'])
 def get_project_status(project_id):
     conn = None
@@ -278,7 +510,34 @@ def get_project_status(project_id):
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
-        
+
+        # ?aggregate=1: totals and per-phase completion counted by MySQL, without the task rows
+        if request.args.get('aggregate') in ('1', 'true'):
+            cursor.execute("""
+                SELECT phase, COUNT(*) AS total_tasks, COALESCE(SUM(completed), 0) AS completed_tasks
+                FROM tasks
+                WHERE project_id = %s
+                GROUP BY phase
+                ORDER BY phase
+            """, (project_id,))
+            phases = cursor.fetchall()
+
+            if not phases:
+                return jsonify({"message": "No tasks found for this project"}), 404
+
+            for phase in phases:
+                phase['completed_tasks'] = int(phase['completed_tasks'])
+                phase['completion_percentage'] = completion_percentage(phase['completed_tasks'], phase['total_tasks'])
+            completed_tasks = sum(phase['completed_tasks'] for phase in phases)
+            total_tasks = sum(phase['total_tasks'] for phase in phases)
+
+            return jsonify({
+                "phases": phases,
+                "completion_percentage": completion_percentage(completed_tasks, total_tasks),
+                "completed_tasks": completed_tasks,
+                "total_tasks": total_tasks
+            })
+
         cursor.execute("""
             SELECT task_id, task_name, phase, completed 
             FROM tasks 
@@ -291,11 +550,10 @@ def get_project_status(project_id):
 
         completed_tasks = sum(1 for task in tasks if task['completed'])
         total_tasks = len(tasks)
-        completion_percentage = round((completed_tasks / total_tasks) * 100, 2) if total_tasks > 0 else 0.0
 
         return jsonify({
             "tasks": tasks,
-            "completion_percentage": completion_percentage,
+            "completion_percentage": completion_percentage(completed_tasks, total_tasks),
             "completed_tasks": completed_tasks,
             "total_tasks": total_tasks
         })
@@ -307,6 +565,72 @@ def get_project_status(project_id):
         if conn:
             conn.close()
 
+def read_project_ids():
+    """Project IDs from ``?project_ids=1,2,3`` or a JSON body ``{"project_ids": [...]}``; ValueError if invalid."""
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        if not isinstance(body, dict):
+            raise ValueError("Body must be a JSON object")
+        project_ids = body.get('project_ids') or []
+        if not isinstance(project_ids, list):
+            raise ValueError("project_ids must be a list")
+    else:
+        project_ids = [p for p in request.args.get('project_ids', '').split(',') if p.strip()]
+    try:
+        project_ids = list(dict.fromkeys(int(p) for p in project_ids))
+    except (TypeError, ValueError):
+        raise ValueError("project_ids must be integers")
+    if len(project_ids) > MAX_PORTFOLIO_IDS:
+        raise ValueError(f"At most {MAX_PORTFOLIO_IDS} project IDs are allowed")
+    return project_ids
+
+@project_bp.route('/portfolio_status', methods=['GET', 'POST'])
+def get_portfolio_status():
+    """Completion for many projects in one query.
+
+    Project IDs come from ``?project_ids=1,2,3`` or a JSON body ``{"project_ids": [...]}``;
+    without any, every project that has tasks is reported.
+    """
+    conn = None
+    cursor = None
+    try:
+        try:
+            project_ids = read_project_ids()
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        where = f"WHERE project_id IN ({', '.join(['%s'] * len(project_ids))})" if project_ids else ""
+        cursor.execute(f"""
+            SELECT project_id, COUNT(*) AS total_tasks, COALESCE(SUM(completed), 0) AS completed_tasks
+            FROM tasks
+            {where}
+            GROUP BY project_id
+        """, tuple(project_ids))
+        rows = {row['project_id']: row for row in cursor.fetchall()}
+
+        statuses = []
+        for project_id in project_ids or sorted(rows):
+            row = rows.get(project_id, {'total_tasks': 0, 'completed_tasks': 0})
+            completed_tasks = int(row['completed_tasks'])
+            statuses.append({
+                "project_id": project_id,
+                "completed_tasks": completed_tasks,
+                "total_tasks": row['total_tasks'],
+                "completion_percentage": completion_percentage(completed_tasks, row['total_tasks'])
+            })
+
+        return jsonify(statuses)
+    except Error as e:
+        return jsonify({"message": "Error fetching portfolio status", "error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
 @project_bp.route('/update_task/<int:task_id>', methods=['PUT'])
 def update_task_status(task_id):
     conn = None
@@ -323,7 +647,14 @@ def update_task_status(task_id):
             SET completed = %s 
             WHERE task_id = %s
         """, (task_data['completed'], task_id))
+        cursor.execute("SELECT project_id, duration_days FROM tasks WHERE task_id = %s", (task_id,))
+        task = cursor.fetchone()
         conn.commit()
+        if task:
+            # Completed tasks have no remaining duration, which moves the schedule
+            project_id, duration_days = task
+            remaining_days = 0 if task_data['completed'] else duration_days
+            update_cached_task(project_id, task_id, remaining_days, completed=task_data['completed'])
 
         return jsonify({"message": "Task status updated successfully!"})
     except Error as e:
@@ -348,21 +679,26 @@ def add_task():
         required_fields = ['project_id', 'task_name', 'phase']
         if not all(field in task_data for field in required_fields):
             return jsonify({"message": "Missing required fields"}), 400
+        duration_days = task_data.get('duration_days', 1)
+        if not valid_duration(duration_days):
+            return jsonify({"message": "duration_days must be a non-negative integer"}), 400
 
         conn = get_db_connection()
         cursor = conn.cursor()
 
         query = """
-            INSERT INTO tasks (project_id, task_name, phase, completed)
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO tasks (project_id, task_name, phase, completed, duration_days)
+            VALUES (%s, %s, %s, %s, %s)
         """
         cursor.execute(query, (
             task_data['project_id'],
             task_data['task_name'],
             task_data['phase'],
-            task_data.get('completed', False)
+            task_data.get('completed', False),
+            duration_days
         ))
         conn.commit()
+        invalidate_schedule(task_data['project_id'])
 
         return jsonify({
             "message": "Task added successfully!",
@@ -378,5 +714,420 @@ def add_task():
         if conn:
             conn.close()
 
+MAX_BULK_ITEMS = 1000
+
+def validate_bulk_tasks(creates, updates, deletes):
+    """Per-item validation errors for a bulk task request."""
+    errors = []
+    for index, task in enumerate(creates):
+        if not isinstance(task, dict) or not all(field in task for field in ['project_id', 'task_name', 'phase']):
+            errors.append({"op": "create", "index": index, "error": "Missing required fields"})
+        elif not valid_duration(task.get('duration_days', 1)):
+            errors.append({"op": "create", "index": index, "error": "duration_days must be a non-negative integer"})
+    for index, task in enumerate(updates):
+        if not isinstance(task, dict) or 'task_id' not in task or 'completed' not in task:
+            errors.append({"op": "update", "index": index, "error": "task_id and completed are required"})
+        elif not isinstance(task['task_id'], int):
+            errors.append({"op": "update", "index": index, "error": "task_id must be an integer"})
+    for index, task_id in enumerate(deletes):
+        if not isinstance(task_id, int):
+            errors.append({"op": "delete", "index": index, "error": "task_id must be an integer"})
+    return errors
+
+@project_bp.route('/tasks/bulk', methods=['POST'])
+def bulk_tasks():
+    """Create, update and delete many tasks in one transaction.
+
+    Body: ``{"create": [{project_id, task_name, phase, completed?, duration_days?}],
+    "update": [{task_id, completed}], "delete": [task_id, ...]}``. Nothing is applied if any item is invalid.
+    """
+    conn = None
+    cursor = None
+    try:
+        task_data = request.get_json()
+        if not task_data:
+            return jsonify({"message": "No data provided"}), 400
+
+        creates = task_data.get('create') or []
+        updates = task_data.get('update') or []
+        deletes = task_data.get('delete') or []
+        if not all(isinstance(items, list) for items in (creates, updates, deletes)):
+            return jsonify({"message": "create, update and delete must be lists"}), 400
+        if len(creates) + len(updates) + len(deletes) > MAX_BULK_ITEMS:
+            return jsonify({"message": f"At most {MAX_BULK_ITEMS} items are allowed per request"}), 400
+
+        errors = validate_bulk_tasks(creates, updates, deletes)
+        if errors:
+            return jsonify({"message": "Invalid items", "errors": errors}), 400
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        conn.start_transaction()
+
+        # Lock every task we are about to touch so the per-item results are accurate
+        existing = {}  # task_id -> project_id
+        touched = list(dict.fromkeys([task['task_id'] for task in updates] + deletes))
+        if touched:
+            cursor.execute(
+                f"SELECT task_id, project_id FROM tasks WHERE task_id IN ({', '.join(['%s'] * len(touched))}) FOR UPDATE",
+                tuple(touched)
+            )
+            existing = dict(cursor.fetchall())
+
+        created = []
+        if creates:
+            # executemany turns this into one multi-row INSERT. Its ids are not guaranteed
+            # consecutive under concurrent writers, so the rows are read back by batch token
+            import_batch = uuid.uuid4().hex
+            cursor.executemany("""
+                INSERT INTO tasks (project_id, task_name, phase, completed, duration_days, import_batch, import_row)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, [
+                (task['project_id'], task['task_name'], task['phase'], bool(task.get('completed', False)),
+                 task.get('duration_days', 1), import_batch, index)
+                for index, task in enumerate(creates)
+            ])
+            cursor.execute(
+                "SELECT task_id, import_row FROM tasks WHERE import_batch = %s ORDER BY import_row", (import_batch,)
+            )
+            created = [
+                {"index": index, "task_id": task_id, "status": "created"} for task_id, index in cursor.fetchall()
+            ]
+
+        updated = []
+        to_update = [task for task in updates if task['task_id'] in existing]
+        if to_update:
+            cursor.execute(
+                f"""
+                UPDATE tasks
+                SET completed = CASE task_id {' '.join(['WHEN %s THEN %s'] * len(to_update))} END
+                WHERE task_id IN ({', '.join(['%s'] * len(to_update))})
+                """,
+                tuple(value for task in to_update for value in (task['task_id'], bool(task['completed'])))
+                + tuple(task['task_id'] for task in to_update)
+            )
+        for index, task in enumerate(updates):
+            status = "updated" if task['task_id'] in existing else "not_found"
+            updated.append({"index": index, "task_id": task['task_id'], "status": status})
+
+        deleted = []
+        to_delete = [task_id for task_id in dict.fromkeys(deletes) if task_id in existing]
+        if to_delete:
+            placeholders = ', '.join(['%s'] * len(to_delete))
+            cursor.execute(f"DELETE FROM tasks WHERE task_id IN ({placeholders})", tuple(to_delete))
+            cursor.execute(
+                f"DELETE FROM task_dependencies WHERE task_id IN ({placeholders}) OR depends_on_task_id IN ({placeholders})",
+                tuple(to_delete) * 2
+            )
+        for index, task_id in enumerate(deletes):
+            status = "deleted" if task_id in existing else "not_found"
+            deleted.append({"index": index, "task_id": task_id, "status": status})
+
+        conn.commit()
+        changed_projects = {task['project_id'] for task in creates}
+        changed_projects.update(existing[task['task_id']] for task in to_update)
+        changed_projects.update(existing[task_id] for task_id in to_delete)
+        for project_id in changed_projects:
+            invalidate_schedule(project_id)
+
+        return jsonify({
+            "message": "Bulk task operations applied successfully!",
+            "created": created,
+            "updated": updated,
+            "deleted": deleted
+        })
+    except Error as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"message": "Error applying bulk task operations", "error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def valid_duration(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+def load_schedules(cursor, project_ids=None):
+    """Critical-path schedules for ``project_ids`` (every project if None) from two queries.
+
+    Returns ``{project_id: (schedule, tasks)}`` with ``tasks`` mapping task id to
+    its row. A project whose dependencies form a cycle gets the
+    ``ScheduleCycleError`` in place of its schedule.
+    """
+    if project_ids is not None and not project_ids:
+        return {}
+    where = f"WHERE project_id IN ({', '.join(['%s'] * len(project_ids))})" if project_ids else ""
+    params = tuple(project_ids or ())
+
+    cursor.execute(f"""
+        SELECT task_id, project_id, task_name, phase, completed, duration_days
+        FROM tasks
+        {where}
+    """, params)
+    tasks = {project_id: {} for project_id in project_ids or ()}
+    for row in cursor.fetchall():
+        tasks.setdefault(row['project_id'], {})[row['task_id']] = row
+
+    cursor.execute(f"SELECT project_id, task_id, depends_on_task_id FROM task_dependencies {where}", params)
+    dependencies = {}
+    for row in cursor.fetchall():
+        dependencies.setdefault(row['project_id'], []).append((row['task_id'], row['depends_on_task_id']))
+
+    schedules = {}
+    for project_id, rows in tasks.items():
+        # Finished work no longer takes time; only what remains is scheduled
+        durations = {task_id: 0 if row['completed'] else row['duration_days'] for task_id, row in rows.items()}
+        try:
+            schedule = ProjectSchedule(durations, dependencies.get(project_id, ()))
+        except ScheduleCycleError as e:
+            schedule = e
+        schedules[project_id] = (schedule, rows)
+    return schedules
+
+def schedule_summary(project, schedule):
+    """Remaining work starts at the project start or today, whichever is later."""
+    start_date = project['start_date']
+    end_date = project['end_date']
+    base_date = max(start_date, date.today()) if start_date else date.today()
+    projected_finish = base_date + timedelta(days=schedule.finish)
+    days_late = (projected_finish - end_date).days if end_date else None
+    return base_date, {
+        "project_id": project['project_id'],
+        "project_name": project['project_name'],
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+        "remaining_days": schedule.finish,
+        "projected_finish": projected_finish.isoformat(),
+        "on_track": days_late <= 0 if days_late is not None else None,
+        "days_late": max(days_late, 0) if days_late is not None else None
+    }
+
+def bump_schedule_generation(project_id):
+    """Mark a committed write to the project's tasks; returns the previous generation. Hold schedule_cache_lock."""
+    generation = schedule_generation.get(project_id, 0)
+    schedule_generation[project_id] = generation + 1
+    return generation
+
+def invalidate_schedule(project_id):
+    """Drop the project's cached schedule after a committed write; builds that read before it are not cached."""
+    with schedule_cache_lock:
+        bump_schedule_generation(project_id)
+        schedule_cache.pop(project_id)
+
+def cache_schedule(project_id, generation, cached):
+    """Cache a schedule whose rows were read at ``generation``, unless a write has committed since."""
+    with schedule_cache_lock:
+        if schedule_generation.get(project_id, 0) == generation:
+            schedule_cache.set(project_id, cached)
+
+def update_cached_task(project_id, task_id, remaining_days, **fields):
+    """Apply an already committed change of one task to its project's cached schedule, if any.
+
+    The dates move incrementally on a copy of the schedule, and the task rows
+    are copied rather than edited, so requests still reading the previous
+    entry never see a half-applied change.
+    """
+    with schedule_cache_lock:
+        bump_schedule_generation(project_id)
+        cached = schedule_cache.get(project_id)
+        if cached is None:
+            return
+        schedule, tasks = cached
+        if task_id not in tasks:
+            # Added by another worker since the schedule was built
+            schedule_cache.pop(project_id)
+            return
+        tasks = dict(tasks)
+        tasks[task_id] = dict(tasks[task_id], **fields)
+        schedule = schedule.copy()
+        schedule.set_duration(task_id, remaining_days)
+        schedule_cache.set(project_id, (schedule, tasks))
+
+def cycle_response(project_id, error):
+    return {"project_id": project_id, "message": str(error), "task_ids": error.task_ids}
+
+@project_bp.route('/schedule/<int:project_id>', methods=['GET'])
+def get_project_schedule(project_id):
+    """Earliest/latest start and finish, slack and the critical path of a project's remaining tasks."""
+    conn = None
+    cursor = None
+    try:
+        # Taken before the first read: a write committing after it keeps this build out of the cache
+        generation = schedule_generation.get(project_id, 0)
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT project_id, project_name, start_date, end_date FROM projects WHERE project_id = %s",
+            (project_id,)
+        )
+        project = cursor.fetchone()
+        if not project:
+            return jsonify({"message": "Project not found"}), 404
+
+        cached = schedule_cache.get(project_id)
+        if cached is None:
+            cached = load_schedules(cursor, [project_id])[project_id]
+            if not isinstance(cached[0], ScheduleCycleError):
+                cache_schedule(project_id, generation, cached)
+        schedule, tasks = cached
+        if isinstance(schedule, ScheduleCycleError):
+            return jsonify(cycle_response(project_id, schedule)), 409
+
+        base_date, summary = schedule_summary(project, schedule)
+        scheduled = []
+        for task in schedule.tasks():
+            row = tasks[task['task_id']]
+            scheduled.append({
+                **task,
+                "task_name": row['task_name'],
+                "phase": row['phase'],
+                "completed": bool(row['completed']),
+                "duration_days": row['duration_days'],
+                "start_date": (base_date + timedelta(days=task['earliest_start'])).isoformat(),
+                "finish_date": (base_date + timedelta(days=task['earliest_finish'])).isoformat()
+            })
+
+        return jsonify({**summary, "critical_path": schedule.critical_path(), "tasks": scheduled})
+    except Error as e:
+        return jsonify({"message": "Error building project schedule", "error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+@project_bp.route('/schedule/portfolio', methods=['GET', 'POST'])
+def get_portfolio_schedule():
+    """Projected finish and critical path for many projects (all of them by default) in three queries.
+
+    Takes project IDs the same way as ``/portfolio_status``.
+    """
+    conn = None
+    cursor = None
+    try:
+        try:
+            project_ids = read_project_ids()
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        where = f"WHERE project_id IN ({', '.join(['%s'] * len(project_ids))})" if project_ids else ""
+        cursor.execute(f"""
+            SELECT project_id, project_name, start_date, end_date
+            FROM projects
+            {where}
+            ORDER BY project_id
+        """, tuple(project_ids))
+        projects = cursor.fetchall()
+        schedules = load_schedules(cursor, [project['project_id'] for project in projects] if project_ids else None)
+
+        results = []
+        for project in projects:
+            schedule, _ = schedules.get(project['project_id']) or (ProjectSchedule({}, ()), {})
+            if isinstance(schedule, ScheduleCycleError):
+                results.append(cycle_response(project['project_id'], schedule))
+                continue
+            _, summary = schedule_summary(project, schedule)
+            results.append({**summary, "critical_path": schedule.critical_path()})
+
+        return jsonify(results)
+    except Error as e:
+        return jsonify({"message": "Error building portfolio schedule", "error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+@project_bp.route('/tasks/<int:task_id>/schedule', methods=['PUT'])
+def update_task_schedule(task_id):
+    """Set a task's ``duration_days`` and/or replace the tasks it ``depends_on``.
+
+    Dependencies must belong to the same project and may not form a cycle
+    (409). A duration change updates a cached schedule incrementally instead
+    of rebuilding it.
+    """
+    conn = None
+    cursor = None
+    try:
+        task_data = request.get_json()
+        if not task_data or ('duration_days' not in task_data and 'depends_on' not in task_data):
+            return jsonify({"message": "duration_days or depends_on is required"}), 400
+        duration_days = task_data.get('duration_days')
+        if 'duration_days' in task_data and not valid_duration(duration_days):
+            return jsonify({"message": "duration_days must be a non-negative integer"}), 400
+        depends_on = task_data.get('depends_on')
+        if depends_on is not None:
+            if not isinstance(depends_on, list) or not all(isinstance(dep, int) and not isinstance(dep, bool) for dep in depends_on):
+                return jsonify({"message": "depends_on must be a list of task IDs"}), 400
+            depends_on = list(dict.fromkeys(depends_on))
+            if task_id in depends_on:
+                return jsonify({"message": "A task cannot depend on itself"}), 400
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        conn.start_transaction()
+        cursor.execute("SELECT project_id, completed FROM tasks WHERE task_id = %s FOR UPDATE", (task_id,))
+        task = cursor.fetchone()
+        if not task:
+            conn.rollback()
+            return jsonify({"message": "Task not found"}), 404
+        project_id = task['project_id']
+        # Before the snapshot read by load_schedules, see get_project_schedule
+        generation = schedule_generation.get(project_id, 0)
+
+        if depends_on is not None:
+            if depends_on:
+                cursor.execute(
+                    f"SELECT task_id FROM tasks WHERE project_id = %s AND task_id IN ({', '.join(['%s'] * len(depends_on))})",
+                    (project_id, *depends_on)
+                )
+                missing = set(depends_on) - {row['task_id'] for row in cursor.fetchall()}
+                if missing:
+                    conn.rollback()
+                    return jsonify({
+                        "message": "Dependencies must be tasks of the same project",
+                        "task_ids": sorted(missing)
+                    }), 400
+            cursor.execute("DELETE FROM task_dependencies WHERE task_id = %s", (task_id,))
+            if depends_on:
+                cursor.executemany(
+                    "INSERT INTO task_dependencies (project_id, task_id, depends_on_task_id) VALUES (%s, %s, %s)",
+                    [(project_id, task_id, dep) for dep in depends_on]
+                )
+        if duration_days is not None:
+            cursor.execute("UPDATE tasks SET duration_days = %s WHERE task_id = %s", (duration_days, task_id))
+
+        if depends_on is not None:
+            # New edges can close a cycle; rebuild before committing so one is never stored
+            schedule, tasks = load_schedules(cursor, [project_id])[project_id]
+            if isinstance(schedule, ScheduleCycleError):
+                conn.rollback()
+                return jsonify(cycle_response(project_id, schedule)), 409
+            conn.commit()
+            with schedule_cache_lock:
+                if bump_schedule_generation(project_id) == generation:
+                    schedule_cache.set(project_id, (schedule, tasks))
+                else:
+                    schedule_cache.pop(project_id)
+        else:
+            conn.commit()
+            remaining_days = 0 if task['completed'] else duration_days
+            update_cached_task(project_id, task_id, remaining_days, duration_days=duration_days)
+
+        return jsonify({"message": "Task schedule updated successfully!", "project_id": project_id})
+    except Error as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"message": "Error updating task schedule", "error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
 if __name__ == '__main__':
     project_bp.run(debug=True)
\ No newline at end of file
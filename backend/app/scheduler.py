@@ -0,0 +1,178 @@
+import heapq
+import threading
+
+
+class ScheduleCycleError(ValueError):
+    """Raised when task dependencies form a cycle; ``task_ids`` are the tasks that could not be ordered."""
+
+    def __init__(self, task_ids):
+        super().__init__(f"Task dependencies form a cycle; tasks {sorted(task_ids)} cannot be scheduled")
+        self.task_ids = task_ids
+
+
+class ProjectSchedule:
+    """Critical-path schedule of one project's tasks.
+
+    ``durations`` maps task id to remaining days (0 for finished tasks);
+    ``dependencies`` are ``(task_id, depends_on_task_id)`` pairs. Building it
+    is a topological sort plus one forward (earliest start/finish) and one
+    backward (latest start/finish) pass, O(tasks + dependencies). Days are
+    offsets from the schedule's start. ``set_duration`` re-propagates only
+    through the tasks whose dates actually move.
+    """
+
+    def __init__(self, durations, dependencies):
+        self.task_ids = list(durations)
+        self._index = {task_id: i for i, task_id in enumerate(self.task_ids)}
+        self.duration = [int(durations[task_id]) for task_id in self.task_ids]
+        n = len(self.task_ids)
+        preds = self._preds = [[] for _ in range(n)]
+        succs = self._succs = [[] for _ in range(n)]
+        index = self._index.get
+        for task_id, depends_on in dependencies:
+            # Dependencies on tasks outside the schedule are ignored
+            i, j = index(task_id), index(depends_on)
+            if i is not None and j is not None:
+                preds[i].append(j)
+                succs[j].append(i)
+
+        self.order = self._topological_order()
+        self._position = [0] * n
+        for position, i in enumerate(self.order):
+            self._position[i] = position
+        self._lock = threading.Lock()
+        self._forward(self.order)
+        self._backward()
+
+    def _topological_order(self):
+        # Kahn's algorithm: repeatedly take tasks whose dependencies are all placed
+        remaining = [len(preds) for preds in self._preds]
+        ready = [i for i, count in enumerate(remaining) if count == 0]
+        order = []
+        succs = self._succs
+        while ready:
+            i = ready.pop()
+            order.append(i)
+            for succ in succs[i]:
+                remaining[succ] -= 1
+                if remaining[succ] == 0:
+                    ready.append(succ)
+        if len(order) != len(self.task_ids):
+            raise ScheduleCycleError([self.task_ids[i] for i, count in enumerate(remaining) if count])
+        return order
+
+    def _forward(self, order):
+        earliest_start = [0] * len(self.task_ids)
+        earliest_finish = [0] * len(self.task_ids)
+        preds, duration = self._preds, self.duration
+        for i in order:
+            start = 0
+            for p in preds[i]:
+                if earliest_finish[p] > start:
+                    start = earliest_finish[p]
+            earliest_start[i] = start
+            earliest_finish[i] = start + duration[i]
+        self.earliest_start, self.earliest_finish = earliest_start, earliest_finish
+        self.finish = max(earliest_finish, default=0)
+
+    def _backward(self):
+        latest_start = [0] * len(self.task_ids)
+        latest_finish = [0] * len(self.task_ids)
+        succs, duration, project_finish = self._succs, self.duration, self.finish
+        for i in reversed(self.order):
+            finish = project_finish
+            for s in succs[i]:
+                if latest_start[s] < finish:
+                    finish = latest_start[s]
+            latest_finish[i] = finish
+            latest_start[i] = finish - duration[i]
+        self.latest_start, self.latest_finish = latest_start, latest_finish
+
+    def copy(self):
+        """An independent copy of the dates; the task graph, fixed after building, is shared."""
+        with self._lock:
+            clone = object.__new__(ProjectSchedule)
+            clone.__dict__.update(self.__dict__)
+            clone.duration = list(self.duration)
+            clone.earliest_start, clone.earliest_finish = list(self.earliest_start), list(self.earliest_finish)
+            clone.latest_start, clone.latest_finish = list(self.latest_start), list(self.latest_finish)
+        clone._lock = threading.Lock()
+        return clone
+
+    def set_duration(self, task_id, days):
+        """Change one task's remaining duration and update the affected dates in place."""
+        with self._lock:
+            i = self._index[task_id]
+            if self.duration[i] == days:
+                return
+            self.duration[i] = days
+
+            # Forward: visit in topological order, only where earliest dates change
+            queue = [(self._position[i], i)]
+            queued = {i}
+            while queue:
+                _, node = heapq.heappop(queue)
+                queued.discard(node)
+                start = max((self.earliest_finish[p] for p in self._preds[node]), default=0)
+                if node != i and start == self.earliest_start[node]:
+                    continue
+                self.earliest_start[node] = start
+                self.earliest_finish[node] = start + self.duration[node]
+                for succ in self._succs[node]:
+                    if succ not in queued:
+                        queued.add(succ)
+                        heapq.heappush(queue, (self._position[succ], succ))
+
+            finish = max(self.earliest_finish, default=0)
+            if finish != self.finish:
+                # Every latest date hangs off the project finish, so they all move
+                self.finish = finish
+                self._backward()
+                return
+
+            # Backward: reverse topological order, only where latest dates change
+            queue = [(-self._position[i], i)]
+            queued = {i}
+            while queue:
+                _, node = heapq.heappop(queue)
+                queued.discard(node)
+                latest_finish = min((self.latest_start[s] for s in self._succs[node]), default=self.finish)
+                latest_start = latest_finish - self.duration[node]
+                if node != i and latest_start == self.latest_start[node]:
+                    continue
+                self.latest_finish[node] = latest_finish
+                self.latest_start[node] = latest_start
+                for pred in self._preds[node]:
+                    if pred not in queued:
+                        queued.add(pred)
+                        heapq.heappush(queue, (-self._position[pred], pred))
+
+    def critical_path(self):
+        """Task ids of one zero-slack chain from the schedule start to its finish."""
+        with self._lock:
+            path = []
+            # A zero-slack task that ends before the finish always has a zero-slack
+            # successor starting the moment it ends, so the walk reaches the finish
+            current = next((i for i in self.order if self.latest_start[i] == 0), None)
+            while current is not None:
+                path.append(self.task_ids[current])
+                current = next((s for s in self._succs[current]
+                                if self.latest_start[s] == self.earliest_start[s] == self.earliest_finish[current]), None)
+            return path
+
+    def tasks(self):
+        """Dates for every task, in topological order."""
+        with self._lock:
+            return [
+                {
+                    'task_id': task_id,
+                    'remaining_days': self.duration[i],
+                    'earliest_start': self.earliest_start[i],
+                    'earliest_finish': self.earliest_finish[i],
+                    'latest_start': self.latest_start[i],
+                    'latest_finish': self.latest_finish[i],
+                    'slack': self.latest_start[i] - self.earliest_start[i],
+                    'critical': self.latest_start[i] == self.earliest_start[i]
+                }
+                for task_id, i in ((self.task_ids[i], i) for i in self.order)
+            ]
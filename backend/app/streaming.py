@@ -0,0 +1,75 @@
+import logging
+
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+FETCH_BATCH_SIZE = 500
+# Rows are buffered into chunks of roughly this many characters before being written out
+CHUNK_SIZE = 64 * 1024
+
+
+def stream_mode():
+    """``'ndjson'``, ``'json'`` or None, from ``?stream=`` or an NDJSON ``Accept`` header."""
+    mode = request.args.get('stream', '').lower()
+    if mode in ('ndjson', 'lines'):
+        return 'ndjson'
+    if mode in ('1', 'true', 'json'):
+        return 'json'
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return 'ndjson'
+    return None
+
+
+def iter_cursor(cursor, batch_size=FETCH_BATCH_SIZE):
+    """Iterate an unbuffered mysql.connector cursor with fetchmany."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def stream_json(rows, serialize, mode, on_close=None):
+    """Stream ``serialize(row)`` for every row as a chunked JSON array or NDJSON.
+
+    Rows are serialized one by one so worker memory stays flat regardless of
+    result size. ``on_close`` runs once the stream finishes (or the client
+    goes away) and is where cursors and connections get released. Values are
+    encoded with the app's JSON provider, so output matches ``jsonify``.
+    """
+    encode = current_app.json.dumps
+
+    def pieces():
+        if mode == 'ndjson':
+            for row in rows:
+                yield encode(serialize(row)) + '\n'
+            return
+
+        yield '['
+        first = True
+        for row in rows:
+            yield ('' if first else ',') + encode(serialize(row))
+            first = False
+        yield ']'
+
+    def generate():
+        try:
+            buffer = []
+            buffered = 0
+            for piece in pieces():
+                buffer.append(piece)
+                buffered += len(piece)
+                if buffered >= CHUNK_SIZE:
+                    yield ''.join(buffer)
+                    buffer, buffered = [], 0
+            if buffer:
+                yield ''.join(buffer)
+        finally:
+            if on_close:
+                try:
+                    on_close()
+                except Exception as e:
+                    logging.warning(f"Error releasing streamed result: {e}")
+
+    mimetype = NDJSON_MIMETYPE if mode == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
@@ -0,0 +1,114 @@
+import numpy as np
+
+
+def normalize(vectors):
+    """L2-normalize rows so a dot product is a cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores, k):
+    """Indices and scores of the k largest entries of each row, best first."""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    return np.take_along_axis(candidate_scores, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+
+class ExactIndex:
+    """Brute-force cosine search over a normalized embedding matrix."""
+
+    kind = 'exact'
+
+    def __init__(self, vectors, normalized=False):
+        # Already-normalized input (e.g. a memory-mapped embedding cache) is used without a copy
+        self.vectors = vectors if normalized else normalize(vectors)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def search(self, queries, k=1):
+        """Return ``(scores, ids)``, each shaped ``(n_queries, k)``."""
+        scores = normalize(queries) @ self.vectors.T
+        return top_k(scores, k)
+
+
+class IVFIndex:
+    """Inverted-file approximate cosine search.
+
+    Vectors are clustered with spherical k-means into ``n_lists`` cells; a
+    query only scores the vectors in its ``n_probe`` closest cells. Each
+    cell's vectors are stored contiguously so probing is a slice, not a gather
+    over the whole matrix.
+    """
+
+    kind = 'ivf'
+
+    def __init__(self, vectors, n_lists=None, n_probe=8, n_iter=10, max_train=20000, seed=0, normalized=False):
+        vectors = np.asarray(vectors, dtype=np.float32) if normalized else normalize(vectors)
+        n_vectors = len(vectors)
+        self.n_lists = n_lists or max(1, int(np.sqrt(n_vectors)))
+        self.n_probe = min(n_probe, self.n_lists)
+
+        rng = np.random.default_rng(seed)
+        train = vectors[rng.choice(n_vectors, min(n_vectors, max_train), replace=False)]
+        self.centroids = self._train_centroids(train, rng, n_iter)
+
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(assignments, kind='stable')
+        self.ids = order
+        self.vectors = vectors[order]
+        self.offsets = np.searchsorted(assignments[order], np.arange(self.n_lists + 1))
+
+    def _train_centroids(self, train, rng, n_iter):
+        centroids = train[rng.choice(len(train), self.n_lists, replace=False)]
+        for _ in range(n_iter):
+            assignments = np.argmax(train @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, train)
+            empty = ~np.bincount(assignments, minlength=self.n_lists).astype(bool)
+            # Re-seed empty cells from random training points
+            sums[empty] = train[rng.choice(len(train), int(empty.sum()))]
+            centroids = normalize(sums)
+        return centroids
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def search(self, queries, k=1):
+        """Return ``(scores, ids)``, each shaped ``(n_queries, k)``; missing slots hold -1."""
+        queries = normalize(queries)
+        _, cells = top_k(queries @ self.centroids.T, self.n_probe)
+
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for row, query in enumerate(queries):
+            positions = np.concatenate([
+                np.arange(self.offsets[cell], self.offsets[cell + 1]) for cell in cells[row]
+            ])
+            if not len(positions):
+                continue
+            scores, best = top_k((self.vectors[positions] @ query)[None, :], k)
+            found = scores.shape[1]
+            all_scores[row, :found] = scores[0]
+            all_ids[row, :found] = self.ids[positions[best[0]]]
+        return all_scores, all_ids
+
+
+def build_index(vectors, kind='auto', ivf_threshold=5000, normalized=False, **options):
+    """Build an exact index, an IVF index, or (``auto``) whichever suits the size."""
+    if kind == 'auto':
+        kind = 'ivf' if len(vectors) >= ivf_threshold else 'exact'
+    if kind == 'exact':
+        return ExactIndex(vectors, normalized=normalized)
+    if kind == 'ivf':
+        return IVFIndex(vectors, normalized=normalized, **options)
+    raise ValueError(f"Unknown vector index kind: {kind}")
@@ -0,0 +1,295 @@
+import csv
+import io
+import json
+import subprocess
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from app.feature_encoder import CostFeatureEncoder
+from app.forest_engine import CompiledForest
+from app.keyword_matcher import KeywordMatcher
+from app.vector_index import ExactIndex, IVFIndex
+
+warnings.filterwarnings("ignore")
+
+MODEL_PATH = 'improved_construction_cost_model_v6.pkl'
+
+
+def timeit(fn, repeat=200):
+    """Median wall time of ``fn`` in milliseconds."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return float(np.median(samples))
+
+
+def random_inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'area': float(rng.integers(500, 5000)),
+            'floors': int(rng.integers(1, 6)),
+            'location': str(rng.choice(['Urban', 'Rural'])),
+            'quality': str(rng.choice(['Basic', 'Standard', 'Premium'])),
+            'construction_type': str(rng.choice(['Residential', 'Commercial', 'Industrial'])),
+            'approx_cost': float(rng.integers(2000, 4000))
+        }
+        for _ in range(n)
+    ]
+
+
+def bench_forest():
+    """Parity and latency of the compiled forest against RandomForestRegressor.predict."""
+    model = joblib.load(MODEL_PATH)
+    compiled = CompiledForest.from_sklearn(model)
+    encoder = CostFeatureEncoder(feature_names=model.feature_names_in_)
+
+    for batch_size in [1, 10, 100, 1000]:
+        X = encoder.transform(random_inputs(batch_size))
+        expected = model.predict(X)
+        actual = compiled.predict(X)
+        if not np.allclose(expected, actual, rtol=1e-9, atol=1e-6):
+            raise AssertionError(f"Compiled forest diverges from sklearn at batch size {batch_size}")
+
+        sklearn_ms = timeit(lambda: model.predict(X), repeat=50)
+        compiled_ms = timeit(lambda: compiled.predict(X), repeat=50)
+        print(f"forest  batch={batch_size:<5} sklearn={sklearn_ms:8.3f} ms  compiled={compiled_ms:8.3f} ms  "
+              f"speedup={sklearn_ms / compiled_ms:5.1f}x")
+
+
+STARTUP_PROBE = """
+import time
+started = time.perf_counter()
+from app import create_app
+app = create_app()
+booted = time.perf_counter()
+client = app.test_client()
+while True:
+    ready = client.get('/ready')
+    states = [model['state'] for model in ready.json['models'].values()]
+    if ready.status_code == 200 or 'failed' in states:
+        break
+    time.sleep(0.01)
+print(booted - started, time.perf_counter() - started, ready.status_code)
+"""
+
+
+def bench_startup(runs=3):
+    """Time from a cold interpreter to create_app() returning, and to /ready reporting 200."""
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', STARTUP_PROBE], capture_output=True, text=True, check=True)
+        boot_s, ready_s, status = output.stdout.strip().splitlines()[-1].split()
+        note = '' if status == '200' else '  (some models failed to load)'
+        print(f"startup create_app={float(boot_s) * 1000:8.1f} ms  ready={float(ready_s) * 1000:8.1f} ms{note}")
+
+
+def clustered_embeddings(n, dim=384, n_topics=1000, seed=0):
+    """Synthetic sentence-embedding-like data: points scattered around topic directions."""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    vectors = topics[rng.integers(0, n_topics, n)] + 1.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors, rng
+
+
+def bench_vector_index(sizes=(1000, 10000, 100000), n_queries=200, k=10):
+    """Recall@k and per-query latency of the IVF index against exact search."""
+    for n in sizes:
+        vectors, rng = clustered_embeddings(n)
+        queries = vectors[rng.integers(0, n, n_queries)] + 0.3 * rng.standard_normal((n_queries, vectors.shape[1]))
+
+        exact = ExactIndex(vectors)
+        started = time.perf_counter()
+        ivf = IVFIndex(vectors)
+        build_s = time.perf_counter() - started
+
+        _, truth = exact.search(queries, k)
+        exact_ms = timeit(lambda: exact.search(queries[:1], k), repeat=50)
+        for n_probe in (8, 32):
+            ivf.n_probe = min(n_probe, ivf.n_lists)
+            _, found = ivf.search(queries, k)
+            recall = np.mean([len(set(t) & set(f)) / k for t, f in zip(truth, found)])
+            ivf_ms = timeit(lambda: ivf.search(queries[:1], k), repeat=50)
+            print(f"index   n={n:<7} exact={exact_ms:7.3f} ms  ivf={ivf_ms:7.3f} ms  recall@{k}={recall:.3f}  "
+                  f"(lists={ivf.n_lists}, probe={ivf.n_probe}, build={build_s:.1f}s)")
+
+
+def bench_keyword_matcher(sizes=(None, 1000, 10000)):
+    """Aho–Corasick keyword fallback against the per-key substring loop it replaced."""
+    with open('construction_dataset.json', 'r', encoding='utf-8') as f:
+        faq_keys = [item['query'].lower() for item in json.load(f)]
+    rng = np.random.default_rng(0)
+    words = sorted({word for key in faq_keys for word in key.split()})
+
+    for size in sizes:
+        keys = faq_keys if size is None else [
+            ' '.join(rng.choice(words, int(rng.integers(4, 12)))) for _ in range(size)
+        ]
+        query = 'how much does ' + ' '.join(rng.choice(words, 30)) + ' cost'
+
+        def loop():
+            for keyword in keys:
+                if keyword in query:
+                    return keyword
+
+        matcher = KeywordMatcher(keys)
+        loop_ms = timeit(loop)
+        matcher_ms = timeit(lambda: matcher.best_match(query))
+        print(f"keyword keys={len(keys):<6} loop={loop_ms:7.3f} ms  automaton={matcher_ms:7.3f} ms")
+
+
+def random_projects(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'project_name': f"Benchmark project {i}",
+            'location': str(rng.choice(['Pune', 'Mumbai', 'Nashik'])),
+            'project_type': str(rng.choice(['Residential', 'Commercial', 'Industrial'])),
+            'sponsor': 'benchmark',
+            'budget': float(rng.integers(100000, 5000000)),
+            'project_area': float(rng.integers(500, 50000)),
+            'start_date': '2024-01-01',
+            'end_date': '2025-06-30'
+        }
+        for i in range(n)
+    ]
+
+
+def bench_import(n=10000, sequential_sample=200):
+    """Bulk /projects/import of ``n`` projects against one /schedule/add_project call per project.
+
+    Needs the MySQL database from the app config; the rows it creates are deleted afterwards.
+    """
+    from flask import Flask
+    from mysql.connector import Error
+    from app.db_pool import mysql_pool
+    from app.routes.project_routes import project_bp
+
+    app = Flask(__name__)
+    mysql_pool.init_app(app)
+    app.register_blueprint(project_bp)
+    client = app.test_client()
+    try:
+        with app.app_context():
+            mysql_pool.checkout().close()
+    except Error as e:
+        print(f"import  skipped, MySQL is not reachable ({e})")
+        return
+
+    projects = random_projects(n)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(projects[0]))
+    writer.writeheader()
+    writer.writerows(projects)
+    csv_body = buffer.getvalue()
+
+    created = []
+    try:
+        started = time.perf_counter()
+        for project in projects[:sequential_sample]:
+            created.append(client.post('/schedule/add_project', json=project).json['project_id'])
+        sequential_s = (time.perf_counter() - started) * n / sequential_sample
+
+        for label, kwargs in [('json', {'json': projects}), ('csv', {'data': csv_body, 'content_type': 'text/csv'})]:
+            started = time.perf_counter()
+            response = client.post('/projects/import', **kwargs)
+            import_s = time.perf_counter() - started
+            created.extend(result['project_id'] for result in response.json['results'])
+            print(f"import  n={n:<6} {label:<4} sequential~{sequential_s:7.2f} s  bulk={import_s:6.2f} s  "
+                  f"speedup={sequential_s / import_s:5.1f}x")
+    finally:
+        with app.app_context():
+            conn = mysql_pool.checkout()
+            cursor = conn.cursor()
+            for start in range(0, len(created), 1000):
+                ids = tuple(created[start:start + 1000])
+                placeholders = ', '.join(['%s'] * len(ids))
+                cursor.execute(f"DELETE FROM tasks WHERE project_id IN ({placeholders})", ids)
+                cursor.execute(f"DELETE FROM projects WHERE project_id IN ({placeholders})", ids)
+            conn.commit()
+            cursor.close()
+            conn.close()
+
+
+def bench_meeting_conflicts(sizes=(1000, 10000)):
+    """Sweep-based double-booking detection against comparing every pair of meetings."""
+    from collections import namedtuple
+    from datetime import datetime, timedelta
+    from app.meeting_conflicts import find_conflicts
+
+    Row = namedtuple('Row', 'id client_name location date_time end_time')
+    rng = np.random.default_rng(0)
+    start = datetime(2026, 1, 1, 8)
+    for n in sizes:
+        meetings = []
+        for i in range(n):
+            date_time = start + timedelta(minutes=30 * int(rng.integers(0, n)))
+            meetings.append(Row(i, f"Client {rng.integers(0, n // 10)}", f"Site {rng.integers(0, n // 20)}",
+                                date_time, date_time + timedelta(minutes=int(rng.choice([30, 60, 90, 120])))))
+
+        def pairwise():
+            found = set()
+            for a in range(n):
+                for b in range(a + 1, n):
+                    first, second = meetings[a], meetings[b]
+                    if first.date_time < second.end_time and second.date_time < first.end_time:
+                        for key in ('client_name', 'location'):
+                            if getattr(first, key) == getattr(second, key):
+                                found.add((key, a, b))
+            return found
+
+        sweep = {(c['conflict_on'], *sorted(c['meeting_ids'])) for c in find_conflicts(meetings, ('client_name', 'location'))}
+        started = time.perf_counter()
+        expected = pairwise()
+        pairwise_ms = (time.perf_counter() - started) * 1000
+        if sweep != expected:
+            raise AssertionError(f"Sweep and pairwise conflicts differ at n={n}")
+        sweep_ms = timeit(lambda: find_conflicts(meetings, ('client_name', 'location')), repeat=5)
+        print(f"conflicts n={n:<6} pairwise={pairwise_ms:9.1f} ms  sweep={sweep_ms:7.1f} ms  conflicts={len(sweep)}")
+
+
+def bench_schedule(sizes=(1000, 10000, 100000), updates=200):
+    """Critical-path build time, and incremental duration updates checked against full rebuilds."""
+    from app.scheduler import ProjectSchedule
+
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        durations = {task_id: int(days) for task_id, days in enumerate(rng.integers(1, 15, n))}
+        # Each task waits on up to three earlier ones, so the graph is acyclic
+        dependencies = [(task_id, int(rng.integers(0, task_id))) for task_id in range(1, n) for _ in range(3)]
+        build_ms = timeit(lambda: ProjectSchedule(durations, dependencies), repeat=3)
+
+        schedule = ProjectSchedule(durations, dependencies)
+        changes = [(int(rng.integers(0, n)), int(rng.integers(0, 15))) for _ in range(updates)]
+        started = time.perf_counter()
+        for task_id, days in changes:
+            schedule.set_duration(task_id, days)
+        update_ms = (time.perf_counter() - started) * 1000 / updates
+        durations.update(changes)
+        rebuilt = ProjectSchedule(durations, dependencies)
+        if schedule.tasks() != rebuilt.tasks():
+            raise AssertionError(f"Incremental schedule differs from a rebuild at n={n}")
+        print(f"schedule n={n:<7} build={build_ms:8.1f} ms  update={update_ms:7.3f} ms  "
+              f"critical_path={len(schedule.critical_path())} tasks")
+
+
+BENCHMARKS = {
+    'forest': bench_forest,
+    'startup': bench_startup,
+    'index': bench_vector_index,
+    'keywords': bench_keyword_matcher,
+    'import': bench_import,
+    'conflicts': bench_meeting_conflicts,
+    'schedule': bench_schedule,
+}
+
+if __name__ == '__main__':
+    # Run from the backend folder: python benchmark.py [name ...]
+    for name in sys.argv[1:] or list(BENCHMARKS):
+        BENCHMARKS[name]()
@@ -1,5 +1,7 @@
 from backend.app import create_app  # Import from backend.app
 from backend.app.models import db  # Import db
+from backend.app.db_pool import get_db_connection
+from backend.app.migrations import run_migrations
 
 
 
@@ -8,6 +10,7 @@ app = create_app()
 # Initialize database and create tables
 with app.app_context():
     db.create_all()
+    run_migrations(get_db_connection())
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,47 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Tests import the backend the same way run.py's blueprints do: as the ``app`` package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.models import db, Meeting, Notification  # noqa: E402
+from app.query_budget import query_counter  # noqa: E402
+from app.routes.meeting_routes import meeting_bp  # noqa: E402
+
+N_MEETINGS = 50
+
+
+@pytest.fixture
+def meeting_app(tmp_path):
+    """The meeting blueprint on a SQLite database seeded with meetings that each have a notification."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'meetings.db'}"
+    db.init_app(app)
+    query_counter.init_app(app)
+    app.register_blueprint(meeting_bp)
+
+    with app.app_context():
+        # SQLite only enforces ON DELETE CASCADE with this pragma, MySQL always does
+        event.listen(db.engine, 'connect', lambda conn, _: conn.execute('PRAGMA foreign_keys=ON'))
+        db.create_all()
+        start = datetime.now() - timedelta(days=N_MEETINGS // 2)
+        for i in range(N_MEETINGS):
+            date_time = start + timedelta(days=i)
+            meeting = Meeting(meeting_topic=f"Topic {i}", place='Site office', location='Pune', date_time=date_time,
+                              end_time=date_time + timedelta(hours=1), client_name=f"Client {i % 5}", agenda='Review')
+            meeting.notifications.append(Notification(notification_type='Reminder', recipient=meeting.client_name,
+                                                      message='Reminder', status='Sent'))
+            db.session.add(meeting)
+        db.session.commit()
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,38 @@
+import pytest
+
+from app.models import Notification
+from app.query_budget import query_counter
+
+MEETING = {'meeting_topic': 'Budget', 'place': 'Site office', 'location': 'Pune', 'date_time': '2030-01-01T10:00',
+           'client_name': 'Client 1', 'agenda': 'Review'}
+
+CALLS = [
+    ('POST', '/meetings', MEETING),
+    ('GET', '/meetings', None),
+    ('GET', '/meetings?include=notifications', None),
+    ('GET', '/meetings/calendar?limit=20&client_name=Client%201', None),
+    ('GET', '/meetings/upcoming', None),
+    ('GET', '/meetings/conflicts', None),
+    ('GET', '/notifications', None),
+    ('PUT', '/meetings/1', dict(MEETING, date_time='2031-01-01T10:00')),
+    ('DELETE', '/meetings/2', None),
+]
+
+
+@pytest.mark.parametrize('method, url, payload', CALLS, ids=[f"{method} {url}" for method, url, _ in CALLS])
+def test_endpoint_within_query_budget(meeting_app, method, url, payload):
+    response = meeting_app.test_client().open(url, method=method, json=payload)
+    assert response.status_code < 400, response.get_data(as_text=True)
+
+    endpoint = meeting_app.url_map.bind('').match(url.split('?')[0], method)[0]
+    budget = query_counter.budget_for(meeting_app, endpoint)
+    assert budget is not None, f"{endpoint} has no @query_budget"
+    assert int(response.headers['X-Query-Count']) <= budget
+
+
+def test_delete_meeting_removes_its_notifications(meeting_app):
+    response = meeting_app.test_client().delete('/meetings/2')
+    assert response.status_code < 400
+
+    with meeting_app.app_context():
+        assert Notification.query.filter_by(meeting_id=2).count() == 0
@@ -4,6 +4,8 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error
 import joblib
+from app.feature_encoder import CostFeatureEncoder
+from app.forest_engine import export_forest
 
 #print("Pandas version:", pd._version_)
 #print("Numpy version:", np._version_)
@@ -36,27 +38,11 @@ if list(data.columns) != expected_columns:
     raise ValueError(f"Dataset columns do not match the expected columns. Found columns: {list(data.columns)}")
 
 # Features and target
-X = data[['Area', 'Floors', 'Location', 'Quality', 'Type', 'ApproxCost']]
 y = data['TotalCost']
 
-# Encode categorical variables
-X = pd.get_dummies(X, columns=['Location', 'Quality', 'Type'], drop_first=True)
-
-# Create interaction terms
-X['Floors_Location_Urban'] = X['Floors'] * X.get('Location_Urban', 0)
-X['Floors_Quality_Premium'] = X['Floors'] * X.get('Quality_Premium', 0)
-X['Floors_Quality_Standard'] = X['Floors'] * X.get('Quality_Standard', 0)
-X['Floors_Type_Commercial'] = X['Floors'] * X.get('Type_Commercial', 0)
-X['Floors_Type_Industrial'] = X['Floors'] * X.get('Type_Industrial', 0)
-X['Area_Floors'] = X['Area'] * X['Floors']
-X['ApproxCost_Floors'] = X['ApproxCost'] * X['Floors']
-X['Location_ApproxCost'] = X.get('Location_Urban', 0) * X['ApproxCost']
-X['Location_Floors'] = X.get('Location_Urban', 0) * X['Floors']
-X['Quality_Location_Urban'] = X.get('Quality_Premium', 0) * X.get('Location_Urban', 0)
-
-# Emphasize higher urban cost and floors
-X['Location'] = np.where(X['Location_Urban'] == 1, 1.2, 1)
-X['Floors_Urban'] = X['Floors'] * X['Location']
+# Encode categorical variables and interaction terms with the same encoder used for serving
+encoder = CostFeatureEncoder.fit(data)
+X = pd.DataFrame(encoder.transform_columns(data), columns=encoder.feature_names)
 
 # Split data
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -70,5 +56,9 @@ y_pred = model.predict(X_test)
 mae = mean_absolute_error(y_test, y_pred)
 print(f"Mean Absolute Error: ₹{mae}")
 
-# Save the model
-joblib.dump(model, 'improved_construction_cost_model_v6.pkl')
\ No newline at end of file
+# Save the model and the feature encoder it was trained with
+joblib.dump(model, 'improved_construction_cost_model_v6.pkl')
+encoder.save('cost_feature_encoder.json')
+
+# Flattened copy of the forest for the compiled inference engine
+export_forest(model, 'improved_construction_cost_model_v6.npz', source_path='improved_construction_cost_model_v6.pkl')
\ No newline at end of file